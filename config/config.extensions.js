@@ -4,5 +4,8 @@ module.exports = config => {
     config = merge({}, config);
     config.extensions = {};
     config.extensions.InteractiveComputeHost = process.env.DEEPFORGE_INTERACTIVE_COMPUTE_HOST;
+    if (process.env.DEEPFORGE_METADATA_FLUSH_INTERVAL) {
+        config.extensions.MetadataFlushInterval = +process.env.DEEPFORGE_METADATA_FLUSH_INTERVAL;
+    }
     return config;
 };
@@ -22,6 +22,11 @@
 
         // DeepForge metadata creation in dist execution
         START_CMD: 'deepforge-cmd',
+        METADATA: {
+            // Large command payloads are stored in the blob and the command
+            // content is replaced with the prefixed hash
+            BLOB_PREFIX: '@',
+        },
 
         IMAGE: {  // all prefixed w/ 'IMG' for simple upload detection
             PREFIX: 'IMG',
@@ -0,0 +1,70 @@
+/*globals define*/
+define([
+    'require',
+], function(
+    require,
+) {
+    // Metadata commands are written by the python job as length-prefixed
+    // frames: a 4 byte (big-endian) payload length, a byte of flags and the
+    // payload ("CMD ID JSON" encoded as utf-8, optionally gzipped).
+    const HEADER_SIZE = 5;
+    const FLAGS = {
+        GZIP: 1,
+    };
+
+    class FrameCollector {
+        constructor() {
+            this.buffer = Buffer.alloc(0);
+            this.handler = null;
+        }
+
+        on(fn) {
+            this.handler = fn;
+        }
+
+        receive(data) {
+            this.buffer = Buffer.concat([this.buffer, data]);
+            let offset = 0;
+            while (this.buffer.length - offset >= HEADER_SIZE) {
+                const length = this.buffer.readUInt32BE(offset);
+                const end = offset + HEADER_SIZE + length;
+                if (end > this.buffer.length) {
+                    break;
+                }
+                const flags = this.buffer[offset + 4];
+                const payload = this.buffer.slice(offset + HEADER_SIZE, end);
+                this.handler(FrameCollector.decode(payload, flags));
+                offset = end;
+            }
+            this.buffer = this.buffer.slice(offset);
+        }
+
+        hasPartialFrame() {
+            return this.buffer.length > 0;
+        }
+
+        static decode(payload, flags) {
+            if (flags & FLAGS.GZIP) {
+                const zlib = require.nodeRequire('zlib');
+                payload = zlib.gunzipSync(payload);
+            }
+            return payload.toString('utf8');
+        }
+
+        static encode(text, flags=0) {
+            let payload = Buffer.from(text, 'utf8');
+            if (flags & FLAGS.GZIP) {
+                const zlib = require.nodeRequire('zlib');
+                payload = zlib.gzipSync(payload);
+            }
+            const header = Buffer.alloc(HEADER_SIZE);
+            header.writeUInt32BE(payload.length, 0);
+            header[4] = flags;
+            return Buffer.concat([header, payload]);
+        }
+    }
+
+    FrameCollector.FLAGS = FLAGS;
+
+    return FrameCollector;
+});
@@ -13,5 +13,14 @@ define([
         }
     }
 
-    return {CommandFailedError};
+    class KernelError extends Error {
+        constructor(request, error) {
+            const {method} = request;
+            super(`Kernel request "${method}" failed: ${error.message}`);
+            this.request = request;
+            this.stderr = error.traceback;
+        }
+    }
+
+    return {CommandFailedError, KernelError};
 });
@@ -0,0 +1,136 @@
+/* globals define */
+define([
+    'deepforge/compute/interactive/message',
+    'deepforge/compute/interactive/errors',
+    'deepforge/compute/line-collector',
+    'deepforge/utils',
+], function(
+    Message,
+    Errors,
+    LineCollector,
+    utils,
+) {
+    const {defer} = utils;
+    const {KernelError} = Errors;
+    const MAX_STDERR_LENGTH = 10000;
+
+    // A long-running process which answers JSON-RPC requests. Requests are
+    // written to its stdin as JSON lines (a list of requests per line) and
+    // the responses are read from stdout as JSON lines. Requests are rejected
+    // if the process exits or does not respond within the timeout.
+    class Kernel {
+        constructor(session, cmd, timeout=Kernel.REQUEST_TIMEOUT) {
+            this.session = session;
+            this.cmd = cmd;
+            this.timeout = timeout;
+            this.task = null;
+            this.stderr = '';
+            this.nextRequestId = 1;
+            this.pending = {};
+        }
+
+        isRunning() {
+            return !!this.task;
+        }
+
+        start() {
+            const task = this.session.spawn(this.cmd);
+            const stdout = new LineCollector();
+            stdout.on(line => this.onResponse(line));
+            task.on(Message.STDOUT, data => stdout.receive(data));
+            task.on(Message.STDERR, data => {
+                this.stderr = (this.stderr + data.toString()).slice(-MAX_STDERR_LENGTH);
+            });
+            task.on(Message.COMPLETE, exitCode => this.onExit(exitCode));
+            this.task = task;
+        }
+
+        async call(method, params) {
+            const [result] = await this.batch([{method, params}]);
+            return result;
+        }
+
+        async batch(calls) {
+            if (!this.isRunning()) {
+                this.start();
+            }
+
+            const requests = calls.map(call => {
+                const {method, params={}} = call;
+                return {id: this.nextRequestId++, method, params};
+            });
+            const responses = requests.map(request => {
+                const deferred = defer();
+                this.pending[request.id] = {request, deferred};
+                return deferred.promise;
+            });
+            this.task.write(JSON.stringify(requests) + '\n');
+            const timeout = setTimeout(() => this.onTimeout(requests), this.timeout);
+            try {
+                return await Promise.all(responses);
+            } finally {
+                clearTimeout(timeout);
+            }
+        }
+
+        onTimeout(requests) {
+            const error = {
+                message: `No response after ${this.timeout / 1000}s`,
+                traceback: this.stderr,
+            };
+            requests
+                .filter(request => this.pending[request.id])
+                .forEach(request => {
+                    const pending = this.pending[request.id];
+                    delete this.pending[request.id];
+                    pending.deferred.reject(new KernelError(request, error));
+                });
+        }
+
+        onResponse(line) {
+            let responses;
+            try {
+                responses = JSON.parse(line);
+            } catch (err) {
+                return;  // not a response
+            }
+
+            [].concat(responses).forEach(response => {
+                const {id, result, error} = response;
+                const pending = this.pending[id];
+                if (pending) {
+                    delete this.pending[id];
+                    if (error) {
+                        pending.deferred.reject(new KernelError(pending.request, error));
+                    } else {
+                        pending.deferred.resolve(result);
+                    }
+                }
+            });
+        }
+
+        onExit(exitCode) {
+            const error = {
+                message: `Kernel exited with code ${exitCode}`,
+                traceback: this.stderr,
+            };
+            Object.values(this.pending).forEach(pending => {
+                pending.deferred.reject(new KernelError(pending.request, error));
+            });
+            this.pending = {};
+            this.task = null;
+            this.stderr = '';
+        }
+
+        close() {
+            if (this.task) {
+                this.session.kill(this.task);
+            }
+            this.session.close();
+        }
+    }
+
+    Kernel.REQUEST_TIMEOUT = 5 * 60 * 1000;
+
+    return Kernel;
+});
@@ -25,6 +25,9 @@ define([
                 const data = await Task.getMessageData(wsMsg);
 
                 const msg = Message.decode(data);
+                if (msg.sessionID !== this.msg.sessionID) {
+                    return;
+                }
                 this.emitMessage(msg);
                 if (msg.type === Message.COMPLETE) {
                     this.channel.unlisten(handler);
@@ -36,6 +39,11 @@ define([
             return deferred.promise;
         }
 
+        write(data) {
+            const {sessionID} = this.msg;
+            this.channel.send(Message.encode(sessionID, Message.STDIN, data));
+        }
+
         emitMessage(msg) {
             if (msg.type === Message.COMPLETE) {
                 this.emit(msg.type, ...msg.data);
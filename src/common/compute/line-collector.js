@@ -11,17 +11,11 @@ define([], function() {
         }
 
         receive(data) {
-            const text = data.toString();
-            const newLineIndex = text.indexOf('\n');
-            let fragment;
-            if (newLineIndex > -1) {
-                const line = this.currentLine + text.substring(0, newLineIndex);
-                this.handler(line);
-                fragment = text.substring(newLineIndex + 1);
+            const [fragment, ...lines] = data.toString().split('\n').reverse();
+            lines.reverse().forEach(line => {
+                this.handler(this.currentLine + line);
                 this.currentLine = '';
-            } else {
-                fragment = text;
-            }
+            });
             this.currentLine += fragment;
         }
 
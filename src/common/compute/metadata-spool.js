@@ -0,0 +1,73 @@
+/*globals define*/
+define([
+    'require',
+    './frame-collector',
+], function(
+    require,
+    FrameCollector,
+) {
+    // Read the metadata commands appended to a spool file by a running job.
+    // The spool file path is passed to the job in DEEPFORGE_METADATA_FILE.
+    const POLL_INTERVAL = 100;
+
+    class MetadataSpool {
+        constructor(filepath, interval=POLL_INTERVAL) {
+            this.filepath = filepath;
+            this.interval = interval;
+            this.collector = new FrameCollector();
+            this.file = null;
+            this.position = 0;
+            this.timeout = null;
+            this.reading = null;
+            this.buffer = Buffer.alloc(64 * 1024);
+        }
+
+        on(fn) {
+            this.collector.on(fn);
+        }
+
+        async start() {
+            const fsp = require.nodeRequire('fs').promises;
+            this.file = await fsp.open(this.filepath, 'w+');
+            this.schedulePoll();
+        }
+
+        schedulePoll() {
+            this.timeout = setTimeout(async () => {
+                this.reading = this.readAvailable();
+                await this.reading;
+                if (this.timeout) {
+                    this.schedulePoll();
+                }
+            }, this.interval);
+        }
+
+        async readAvailable() {
+            const {buffer} = this;
+            let bytesRead;
+            do {
+                ({bytesRead} = await this.file.read(buffer, 0, buffer.length, this.position));
+                this.position += bytesRead;
+                this.collector.receive(buffer.slice(0, bytesRead));
+            } while (bytesRead === buffer.length);
+        }
+
+        async stop() {
+            if (!this.file) {
+                return;
+            }
+            clearTimeout(this.timeout);
+            this.timeout = null;
+            await this.reading;
+            await this.readAvailable();
+            await this.file.close();
+            this.file = null;
+
+            if (this.collector.hasPartialFrame()) {
+                throw new Error(`Incomplete metadata frame in ${this.filepath}`);
+            }
+        }
+    }
+
+    return MetadataSpool;
+});
@@ -0,0 +1,127 @@
+/* globals define */
+(function(root, factory){
+    if(typeof define === 'function' && define.amd) {
+        define([], function(){
+            return factory();
+        });
+    } else if(typeof module === 'object' && module.exports) {
+        module.exports = factory();
+    }
+}(this, function() {
+    // Decode the base64 typed arrays sent by the deepforge matplotlib backends.
+    // Encoded arrays are of the form {dtype, shape, bdata, mask} where mask
+    // (optional) contains a bit for each invalid (NaN) entry. This is a superset
+    // of the typed array encoding used by plotly.
+    const TYPED_ARRAYS = {
+        i1: Int8Array,
+        u1: Uint8Array,
+        u1c: Uint8ClampedArray,
+        i2: Int16Array,
+        u2: Uint16Array,
+        i4: Int32Array,
+        u4: Uint32Array,
+        f4: Float32Array,
+        f8: Float64Array,
+    };
+
+    const isEncoded = function (value) {
+        return !!value && typeof value === 'object' &&
+            typeof value.bdata === 'string' &&
+            Object.prototype.hasOwnProperty.call(TYPED_ARRAYS, value.dtype);
+    };
+
+    const toBytes = function (base64) {
+        if (typeof Buffer !== 'undefined') {
+            // copy the bytes to ensure the buffer is aligned for the typed array
+            return new Uint8Array(Buffer.from(base64, 'base64'));
+        }
+        const chars = atob(base64);
+        const bytes = new Uint8Array(chars.length);
+        for (let i = 0; i < chars.length; i++) {
+            bytes[i] = chars.charCodeAt(i);
+        }
+        return bytes;
+    };
+
+    const applyMask = function (values, mask) {
+        const bits = toBytes(mask);
+        const result = Array.from(values);
+        for (let i = 0; i < result.length; i++) {
+            if (bits[i >> 3] & (1 << (i & 7))) {
+                result[i] = null;
+            }
+        }
+        return result;
+    };
+
+    const getShape = function (encoded, length) {
+        const {shape=[length]} = encoded;
+        if (typeof shape === 'string') {
+            return shape.split(',').map(dim => +dim);
+        }
+        return shape;
+    };
+
+    const reshape = function (values, shape) {
+        if (shape.length < 2) {
+            return values;
+        }
+        const [rows, ...rowShape] = shape;
+        const rowSize = rowShape.reduce((size, dim) => size * dim, 1);
+        const result = new Array(rows);
+        for (let i = 0; i < rows; i++) {
+            const row = Array.prototype.slice.call(values, i * rowSize, (i + 1) * rowSize);
+            result[i] = reshape(row, rowShape);
+        }
+        return result;
+    };
+
+    const decode = function (encoded, useTypedArrays=false) {
+        const TypedArray = TYPED_ARRAYS[encoded.dtype];
+        let values = new TypedArray(toBytes(encoded.bdata).buffer);
+        if (encoded.mask) {
+            values = applyMask(values, encoded.mask);
+        } else if (!useTypedArrays) {
+            values = Array.from(values);
+        }
+        return reshape(values, getShape(encoded, values.length));
+    };
+
+    // Split an encoded (1D or 2D) array into a typed array for each column
+    const decodeColumns = function (encoded) {
+        const TypedArray = TYPED_ARRAYS[encoded.dtype];
+        const values = new TypedArray(toBytes(encoded.bdata).buffer);
+        const [rows, cols=1] = getShape(encoded, values.length);
+        if (cols === 1) {
+            return [values];
+        }
+
+        const columns = [];
+        for (let j = 0; j < cols; j++) {
+            const column = new TypedArray(rows);
+            for (let i = 0; i < rows; i++) {
+                column[i] = values[i * cols + j];
+            }
+            columns.push(column);
+        }
+        return columns;
+    };
+
+    const decodeAll = function (value, useTypedArrays=false) {
+        if (isEncoded(value)) {
+            return decode(value, useTypedArrays);
+        } else if (Array.isArray(value)) {
+            return value.map(item => decodeAll(item, useTypedArrays));
+        } else if (value && typeof value === 'object') {
+            const result = {};
+            Object.entries(value).forEach(entry => {
+                const [key, item] = entry;
+                result[key] = decodeAll(item, useTypedArrays);
+            });
+            return result;
+        }
+        return value;
+    };
+
+    return {decode, decodeAll, decodeColumns, isEncoded};
+}));
@@ -0,0 +1,61 @@
+/* globals define */
+(function(root, factory){
+    if(typeof define === 'function' && define.amd) {
+        define([], function(){
+            return factory();
+        });
+    } else if(typeof module === 'object' && module.exports) {
+        module.exports = factory();
+    }
+}(this, function() {
+    // Apply the changes sent by the deepforge matplotlib backends (PLOT_PATCH)
+    // to a previously received figure state.
+    const concat = function (values, newValues) {
+        const isSameTypedArray = ArrayBuffer.isView(values) &&
+            values.constructor === newValues.constructor;
+
+        if (isSameTypedArray) {
+            const result = new values.constructor(values.length + newValues.length);
+            result.set(values);
+            result.set(newValues, values.length);
+            return result;
+        }
+        return Array.from(values).concat(Array.from(newValues));
+    };
+
+    const OPERATIONS = {
+        set: (parent, key, value) => parent[key] = value,
+        append: (parent, key, values) => {
+            const current = parent[key] || [];
+            parent[key] = concat(current, values);
+        },
+        truncate: (parent, key, length) => parent[key].length = length,
+        delete: (parent, key) => delete parent[key],
+    };
+
+    const applyChange = function (state, change) {
+        const [op, path, value] = change;
+        const applyOp = OPERATIONS[op];
+        if (!applyOp) {
+            throw new Error(`Unsupported figure update operation: ${op}`);
+        }
+
+        if (path.length === 0) {
+            const root = {state};
+            applyOp(root, 'state', value);
+            return root.state;
+        }
+
+        const parent = path.slice(0, -1)
+            .reduce((value, key) => value[key], state);
+        const key = path[path.length - 1];
+        applyOp(parent, key, value);
+        return state;
+    };
+
+    const apply = function (state, changes) {
+        return changes.reduce(applyChange, state);
+    };
+
+    return {apply};
+}));
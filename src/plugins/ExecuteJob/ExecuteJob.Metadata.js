@@ -4,19 +4,90 @@ define([
     'common/util/assert',
     'deepforge/Constants',
     './metadata/index',
+    './metadata/FlushScheduler',
+    './metadata/PayloadStore',
 ], function (
     assert,
     CONSTANTS,
     Metadata,
+    FlushScheduler,
+    PayloadStore,
 ) {
 
     const ExecuteJob = function () {};
 
-    ExecuteJob.prototype.initializeMetadata = async function (job) {
+    ExecuteJob.prototype.initializeMetadataUpdates = function (defaultInterval) {
+        const {extensions={}} = this.gmeConfig;
+        const interval = extensions.MetadataFlushInterval !== undefined ?
+            extensions.MetadataFlushInterval : defaultInterval;
+        this.metadataUpdates = new FlushScheduler(
+            updates => this.saveMetadataUpdates(updates),
+            interval,
+            update => Object.assign({}, update, {value: JSON.parse(JSON.stringify(update.value))})
+        );
+        this.metadataStore = new PayloadStore(
+            () => this.getStorageClient(),
+            `${this.projectId}/metadata`
+        );
+    };
+
+    ExecuteJob.prototype.applyMetadataUpdates = async function (updates=this.metadataUpdates.take()) {
+        const nodes = [];
+        const checkpoints = {};
+        for (const update of Object.values(updates)) {
+            const {node, attribute, isExternal, summary, checkpoint} = update;
+            let {value} = update;
+            if (isExternal) {
+                try {
+                    value = Object.assign(await this.metadataStore.put(value), {summary});
+                } catch (err) {
+                    this.logger.warn(`Unable to upload ${attribute} to storage (storing in node): ${err}`);
+                }
+            }
+            this.core.setAttribute(node, attribute, JSON.stringify(value));
+            nodes.push(node);
+
+            if (checkpoint) {
+                const jobId = this.core.getPath(checkpoint.job);
+                if (!checkpoints[jobId] || checkpoints[jobId].count < checkpoint.count) {
+                    checkpoints[jobId] = checkpoint;
+                }
+            }
+        }
+
+        // Record the applied commands in the same commit as the resulting
+        // states so a resumed job continues from the saved states
+        Object.values(checkpoints).forEach(({job, count}) => {
+            this.core.setAttribute(job, 'lastAppliedCmd', count);
+        });
+
+        return nodes;
+    };
+
+    ExecuteJob.prototype.saveMetadataUpdates = async function (updates) {
+        try {
+            const nodes = await this.applyMetadataUpdates(updates);
+            const names = nodes
+                .map(node => this.core.getAttribute(this.core.getParent(node), 'name'))
+                .filter((name, index, names) => names.indexOf(name) === index);
+            const {updateCount, coalescedCount} = this.metadataUpdates;
+            this.logger.debug(`Coalesced ${coalescedCount}/${updateCount} metadata updates`);
+
+            await this.save(`Updated graph/image output for ${names.join(', ')}`);
+        } catch (err) {
+            this.logger.error(`Unable to save metadata updates: ${err}`);
+        }
+    };
+
+    ExecuteJob.prototype.initializeMetadata = async function (job, isResuming=false) {
         const nodeId = this.core.getPath(job);
-        this.lastAppliedCmd[nodeId] = 0;
-        const metadata = await this.getMetadataNodes(job);
-        await Promise.all(metadata.map(node => this.resetMetadataNode(node, job)));
+        const savedCount = isResuming ? this.core.getAttribute(job, 'lastAppliedCmd') : 0;
+        this.lastAppliedCmd[nodeId] = savedCount || 0;
+        if (this.lastAppliedCmd[nodeId] === 0) {
+            this.core.delAttribute(job, 'lastAppliedCmd');
+            const metadata = await this.getMetadataNodes(job);
+            await Promise.all(metadata.map(node => this.resetMetadataNode(node, job)));
+        }
     };
 
     ExecuteJob.prototype.clearOldMetadata = async function (job) {
@@ -36,6 +107,7 @@ define([
 
             delete this.lastAppliedCmd[nodeId];
             this.core.delAttribute(job, 'jobInfo');
+            this.core.delAttribute(job, 'lastAppliedCmd');
         }
     };
 
@@ -80,13 +152,14 @@ define([
                     cmd = args[0];
                     cmdId = args[1];
                     content = matches[m].substring(matches[m].indexOf(cmdId) + cmdId.length);
-                    if (!skip || cmdCnt >= this.lastAppliedCmd[jobId]) {
-                        this.lastAppliedCmd[jobId]++;
+                    if (!skip || cmdCnt > this.lastAppliedCmd[jobId]) {
+                        const count = ++this.lastAppliedCmd[jobId];
                         await this.onMetadataCommand(
                             job,
                             cmd,
                             +cmdId,
-                            JSON.parse(content)
+                            await this.parseMetadataContent(content),
+                            count
                         );
                         hasMetadata = true;
                     }
@@ -101,13 +174,29 @@ define([
         };
     };
 
-    ExecuteJob.prototype.onMetadataCommand = async function (job, cmd, id, content) {
+    ExecuteJob.prototype.parseMetadataContent = async function (content) {
+        content = content.trim();
+        if (content.startsWith(CONSTANTS.METADATA.BLOB_PREFIX)) {
+            const hash = content.substring(CONSTANTS.METADATA.BLOB_PREFIX.length);
+            content = await this.blobClient.getObjectAsString(hash);
+        }
+        return JSON.parse(content);
+    };
+
+    ExecuteJob.prototype.onMetadataCommand = async function (job, cmd, id, content, count) {
         const MetadataClass = Metadata.getClassForCommand(cmd);
         const metadata = await this.getMetadataNodes(job);
         const node = metadata.find(node => +this.core.getAttribute(node, 'id') === id) ||
             await this.createNodeForMetadata(MetadataClass, job, id);
 
-        const md = new MetadataClass(node, this.core, this.META);
+        const md = new MetadataClass(
+            node,
+            this.core,
+            this.META,
+            this.metadataUpdates,
+            this.metadataStore,
+            {job, count}
+        );
         await md.update(content);
     };
 
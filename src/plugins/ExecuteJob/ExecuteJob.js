@@ -66,6 +66,7 @@ define([
 
         // Metadata updating
         this.lastAppliedCmd = {};
+        this.metadataUpdates = null;
         this.canceled = false;
 
         this.logManager = null;
@@ -79,6 +80,7 @@ define([
 
     ExecuteJob.metadata = pluginMetadata;
     ExecuteJob.HEARTBEAT_INTERVAL = 2500;
+    ExecuteJob.METADATA_FLUSH_INTERVAL = 5000;
 
     // Prototypical inheritance from PluginBase.
     ExecuteJob.prototype = Object.create(PluginBase.prototype);
@@ -97,6 +99,7 @@ define([
         this.originManager = new JobOriginClient(params);
         this.pulseClient = new ExecPulseClient(params);
         this._execHashToJobNode = {};
+        this.initializeMetadataUpdates(ExecuteJob.METADATA_FLUSH_INTERVAL);
 
         this.compute = null;
         return result;
@@ -311,13 +314,8 @@ define([
         this.outputLineCount[id] = count;
 
         const stdout = await this.compute.getConsoleOutput(jobInfo);
-        const result = await this.processStdout(job, stdout);
-
-        if (result.hasMetadata) {
-            const name = this.core.getAttribute(job, 'name');
-            const msg = `Updated graph/image output for ${name}`;
-            await this.save(msg);
-        }
+        await this.processStdout(job, stdout);
+        await this.metadataUpdates.flush();
 
         return this.getOperation(job);
     };
@@ -638,15 +636,11 @@ define([
         await this.logManager.appendTo(jobId, output);
         // Send notification to all clients watching the branch
         await this.notifyStdoutUpdate(jobId);
-
-        if (result.hasMetadata) {
-            const name = this.core.getAttribute(job, 'name');
-            const msg = `Updated graph/image output for ${name}`;
-            await this.save(msg);
-        }
     };
 
     ExecuteJob.prototype.onOperationEnd = async function (err, job) {
+        // Metadata updates are committed with the result of the operation
+        await this.applyMetadataUpdates();
         if (err) {
             await this.onOperationFail(job, err);
             return;
@@ -675,6 +669,7 @@ define([
             const opName = this.core.getAttribute(op, 'name');
             const stdout = await this.compute.getConsoleOutput(jobInfo);
             const result = await this.processStdout(job, stdout);
+            await this.applyMetadataUpdates();
 
             // Parse the remaining code
             this.core.setAttribute(job, 'stdout', result.stdout);
@@ -1,12 +1,31 @@
 /* globals define */
 define([
-    './Metadata'
+    './Metadata',
+    'deepforge/viz/BinaryArrays',
 ], function(
-    Metadata
+    Metadata,
+    BinaryArrays,
 ) {
     class Figure extends Metadata {
         async update(state) {
-            this.core.setAttribute(this.node, 'data', JSON.stringify(state));
+            this.setData(BinaryArrays.decodeAll(state));
+        }
+
+        async getData() {
+            return await this.getAttributeValue('data');
+        }
+
+        setData(state) {
+            this.setAttributeValue('data', state, Figure.getSummary(state));
+        }
+
+        static getSummary(state) {
+            const {data=[], layout={}} = state;
+            const {title={}} = layout;
+            return {
+                title: typeof title === 'string' ? title : title.text,
+                traceCount: data.length,
+            };
         }
 
         setAxesProperties(axesNode, axes){
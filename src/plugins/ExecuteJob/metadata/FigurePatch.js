@@ -0,0 +1,26 @@
+/* globals define */
+define([
+    './Figure',
+    'deepforge/viz/PlotPatch',
+    'deepforge/viz/BinaryArrays',
+], function(
+    Figure,
+    PlotPatch,
+    BinaryArrays,
+) {
+    class FigurePatch extends Figure {
+        async update(changes) {
+            const data = await this.getData();
+            if (data) {
+                changes = BinaryArrays.decodeAll(changes);
+                this.setData(PlotPatch.apply(data, changes));
+            }
+        }
+
+        static getCommand() {
+            return 'PLOT_PATCH';
+        }
+    }
+
+    return FigurePatch;
+});
@@ -0,0 +1,77 @@
+/* globals define */
+define([
+], function(
+) {
+    // Buffer the latest value for each key (such as the state of a metadata
+    // node) and flush the buffered values at most once per interval. The
+    // latest values are kept after flushing so they can be updated without
+    // being loaded again. As they may be updated in place, the flushed values
+    // are copies (created with the snapshot function) taken when removed.
+    class FlushScheduler {
+        constructor(flush, interval, snapshot=value => value) {
+            this.flushFn = flush;
+            this.interval = interval;
+            this.snapshot = snapshot;
+            this.values = {};
+            this.pending = {};
+            this.timeout = null;
+            this.lastFlush = 0;
+            this.flushing = Promise.resolve();
+            this.updateCount = 0;
+            this.coalescedCount = 0;
+        }
+
+        get(key) {
+            return this.values[key];
+        }
+
+        set(key, value) {
+            if (this.pending.hasOwnProperty(key)) {
+                this.coalescedCount++;
+            }
+            this.updateCount++;
+            this.values[key] = value;
+            this.pending[key] = value;
+            this.schedule();
+        }
+
+        hasPending() {
+            return Object.keys(this.pending).length > 0;
+        }
+
+        schedule() {
+            if (!this.timeout) {
+                const elapsed = Date.now() - this.lastFlush;
+                const delay = Math.max(0, this.interval - elapsed);
+                this.timeout = setTimeout(() => this.flush(), delay);
+            }
+        }
+
+        cancel() {
+            clearTimeout(this.timeout);
+            this.timeout = null;
+        }
+
+        // Remove the buffered values (without flushing them)
+        take() {
+            this.cancel();
+            const pending = {};
+            Object.entries(this.pending).forEach(([key, value]) => {
+                pending[key] = this.snapshot(value);
+            });
+            this.pending = {};
+            return pending;
+        }
+
+        async flush() {
+            const pending = this.take();
+            if (Object.keys(pending).length) {
+                this.lastFlush = Date.now();
+                this.flushing = this.flushing.then(() => this.flushFn(pending));
+            }
+            return this.flushing;
+        }
+    }
+
+    return FlushScheduler;
+});
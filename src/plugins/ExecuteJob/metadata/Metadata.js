@@ -1,12 +1,49 @@
 /* globals define */
 define([
+    './PayloadStore',
 ], function(
+    PayloadStore,
 ) {
     class Metadata {
-        constructor(node, core, META) {
+        constructor(node, core, META, updates=null, store=null, checkpoint=null) {
             this.node = node;
             this.core = core;
             this.META = META;
+            this.updates = updates;
+            this.store = store;
+            this.checkpoint = checkpoint;
+        }
+
+        // Attribute values are set directly unless buffered by a FlushScheduler
+        async getAttributeValue(attribute) {
+            const key = this.getUpdateKey(attribute);
+            if (this.updates && this.updates.get(key)) {
+                return this.updates.get(key).value;
+            }
+            const json = this.core.getAttribute(this.node, attribute);
+            const value = json && JSON.parse(json);
+            if (PayloadStore.isReference(value) && this.store) {
+                return await this.store.get(value);
+            }
+            return value;
+        }
+
+        // Large values can be stored externally (in a PayloadStore) when the
+        // buffered updates are applied. The summary is stored with the reference.
+        // The checkpoint (the command producing the value) is saved with it.
+        setAttributeValue(attribute, value, summary=null) {
+            if (this.updates) {
+                const key = this.getUpdateKey(attribute);
+                const isExternal = !!summary;
+                const {checkpoint} = this;
+                this.updates.set(key, {node: this.node, attribute, value, isExternal, summary, checkpoint});
+            } else {
+                this.core.setAttribute(this.node, attribute, JSON.stringify(value));
+            }
+        }
+
+        getUpdateKey(attribute) {
+            return `${this.core.getPath(this.node)}/${attribute}`;
         }
 
         async update(/*content*/) {
@@ -0,0 +1,62 @@
+/* globals define */
+define([
+    'require',
+], function(
+    require,
+) {
+    // Store large metadata payloads (such as figure states) in the configured
+    // storage backend. The payloads are content-addressed so identical states
+    // are only uploaded once; nodes only store a reference to the payload:
+    //   {hash, dataInfo, size}
+    class PayloadStore {
+        constructor(getClient, dirname) {
+            this.getClient = getClient;
+            this.dirname = dirname;
+            this.client = null;
+            this.references = {};
+        }
+
+        async put(value) {
+            const content = JSON.stringify(value);
+            const hash = PayloadStore.getHash(content);
+            if (!this.references[hash]) {
+                const client = await this.getStorageClient();
+                const dataInfo = await client.putFile(`${this.dirname}/${hash}.json`, content);
+                this.references[hash] = {hash, dataInfo, size: content.length};
+            }
+            return Object.assign({}, this.references[hash]);
+        }
+
+        async get(reference) {
+            const client = await this.getStorageClient();
+            const content = await client.getFile(reference.dataInfo);
+            return PayloadStore.parse(content);
+        }
+
+        async getStorageClient() {
+            if (!this.client) {
+                this.client = this.getClient();
+            }
+            return await this.client;
+        }
+
+        static getHash(content) {
+            const crypto = require.nodeRequire('crypto');
+            return crypto.createHash('sha256').update(content).digest('hex');
+        }
+
+        static isReference(value) {
+            return !!value && typeof value === 'object' &&
+                typeof value.hash === 'string' && !!value.dataInfo;
+        }
+
+        static parse(content) {
+            if (typeof content !== 'string') {
+                content = new TextDecoder().decode(content);
+            }
+            return JSON.parse(content);
+        }
+    }
+
+    return PayloadStore;
+});
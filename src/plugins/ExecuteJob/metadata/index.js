@@ -1,11 +1,13 @@
 /* globals define */
 define([
     './Figure',
+    './FigurePatch',
 ], function(
     Figure,
+    FigurePatch,
 ) {
 
-    const MetadataClasses = [Figure];
+    const MetadataClasses = [Figure, FigurePatch];
     function getClassForCommand(cmd) {
         return MetadataClasses.find(clazz => {
             return clazz.getCommand() === cmd;
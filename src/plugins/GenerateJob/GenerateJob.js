@@ -211,6 +211,7 @@ define([
         const serializeTpl = _.template(Templates.DEEPFORGE_SERIALIZATION);
         files.addFile('deepforge/serialization.py', serializeTpl(CONSTANTS));
         files.addFile('deepforge/__init__.py', Templates.DEEPFORGE_INIT);
+        files.addFile('deepforge/plotting.py', Templates.DEEPFORGE_PLOTTING);
     };
 
     GenerateJob.prototype.getStorageConfig = function () {
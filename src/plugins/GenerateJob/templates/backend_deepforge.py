@@ -65,9 +65,6 @@ Naming Conventions
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 import math
-import base64
-import io
-import itertools
 import six
 
 import numpy as np
@@ -78,117 +75,11 @@ from matplotlib.backend_bases import (
      FigureCanvasBase, FigureManagerBase, GraphicsContextBase, RendererBase)
 from matplotlib.figure import Figure
 from matplotlib.colors import to_hex
-from matplotlib import transforms, collections
+from matplotlib import collections
 from matplotlib.collections import LineCollection, PathCollection
-from matplotlib.path import Path
 from mpl_toolkits.mplot3d import Axes3D
 from mpl_toolkits.mplot3d.art3d import Line3D, Path3DCollection
-from matplotlib.pyplot import gcf, close
-import simplejson as json
-
-# The following functions are used as they are from the mplexporter library
-# Available at: https://github.com/mpld3/mplexporter
-PATH_DICT = {Path.LINETO: 'L',
-             Path.MOVETO: 'M',
-             Path.CURVE3: 'S',
-             Path.CURVE4: 'C',
-             Path.CLOSEPOLY: 'Z'}
-
-def SVG_path(path, transform=None, simplify=False):
-    """Construct the vertices and SVG codes for the path
-
-    Parameters
-    ----------
-    path : matplotlib.Path object
-
-    transform : matplotlib transform (optional)
-        if specified, the path will be transformed before computing the output.
-
-    Returns
-    -------
-    vertices : array
-        The shape (M, 2) array of vertices of the Path. Note that some Path
-        codes require multiple vertices, so the length of these vertices may
-        be longer than the list of path codes.
-    path_codes : list
-        A length N list of single-character path codes, N <= M. Each code is
-        a single character, in ['L','M','S','C','Z']. See the standard SVG
-        path specification for a description of these.
-    """
-    if transform is not None:
-        path = path.transformed(transform)
-
-    vc_tuples = [(vertices if path_code != Path.CLOSEPOLY else [],
-                  PATH_DICT[path_code])
-                 for (vertices, path_code)
-                 in path.iter_segments(simplify=simplify)]
-
-    if not vc_tuples:
-        # empty path is a special case
-        return np.zeros((0, 2)), []
-    else:
-        vertices, codes = zip(*vc_tuples)
-        vertices = np.array(list(itertools.chain(*vertices))).reshape(-1, 2)
-        return vertices, list(codes)
-
-def process_transform(transform, ax=None, data=None, return_trans=False,
-                      force_trans=None):
-    """Process the transform and convert data to figure or data coordinates
-
-    Parameters
-    ----------
-    transform : matplotlib Transform object
-        The transform applied to the data
-    ax : matplotlib Axes object (optional)
-        The axes the data is associated with
-    data : ndarray (optional)
-        The array of data to be transformed.
-    return_trans : bool (optional)
-        If true, return the final transform of the data
-    force_trans : matplotlib.transform instance (optional)
-        If supplied, first force the data to this transform
-
-    Returns
-    -------
-    code : string
-        Code is either "data", "axes", "figure", or "display", indicating
-        the type of coordinates output.
-    transform : matplotlib transform
-        the transform used to map input data to output data.
-        Returned only if return_trans is True
-    new_data : ndarray
-        Data transformed to match the given coordinate code.
-        Returned only if data is specified
-    """
-    if isinstance(transform, transforms.BlendedGenericTransform):
-        warnings.warn("Blended transforms not yet supported. "
-                      "Zoom behavior may not work as expected.")
-
-    if force_trans is not None:
-        if data is not None:
-            data = (transform - force_trans).transform(data)
-        transform = force_trans
-
-    code = "display"
-    if ax is not None:
-        for (c, trans) in [("data", ax.transData),
-                           ("axes", ax.transAxes),
-                           ("figure", ax.figure.transFigure),
-                           ("display", transforms.IdentityTransform())]:
-            if transform.contains_branch(trans):
-                code, transform = (c, transform - trans)
-                break
-
-    if data is not None:
-        if return_trans:
-            return code, transform.transform(data), transform
-        else:
-            return code, transform.transform(data)
-    else:
-        if return_trans:
-            return code, transform
-        else:
-            return code
+from deepforge import plotting
 
 class RendererTemplate(RendererBase):
     """
@@ -204,29 +95,26 @@ class RendererTemplate(RendererBase):
     def draw_path(self, gc, path, transform, rgbFace=None):
         pass
 
-    # draw_markers is optional, and we get more correct relative
-    # timings by leaving it out.  backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_markers(self, gc, marker_path, marker_trans, path, trans,
-#                      rgbFace=None):
-#         pass
-
-    # draw_path_collection is optional, and we get more correct
-    # relative timings by leaving it out. backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_path_collection(self, gc, master_transform, paths,
-#                              all_transforms, offsets, offsetTrans,
-#                              facecolors, edgecolors, linewidths, linestyles,
-#                              antialiaseds):
-#         pass
-
-    # draw_quad_mesh is optional, and we get more correct
-    # relative timings by leaving it out.  backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_quad_mesh(self, gc, master_transform, meshWidth, meshHeight,
-#                        coordinates, offsets, offsetTrans, facecolors,
-#                        antialiased, edgecolors):
-#         pass
+    # The following are optional but the default implementations draw each
+    # marker/path separately which is slow for large collections.
+    def draw_markers(self, gc, marker_path, marker_trans, path, trans,
+                     rgbFace=None):
+        pass
+
+    def draw_path_collection(self, gc, master_transform, paths,
+                             all_transforms, offsets, offsetTrans,
+                             facecolors, edgecolors, linewidths, linestyles,
+                             antialiaseds, *args, **kwargs):
+        pass
+
+    def draw_quad_mesh(self, gc, master_transform, meshWidth, meshHeight,
+                       coordinates, offsets, offsetTrans, facecolors,
+                       antialiased, edgecolors):
+        pass
+
+    def draw_gouraud_triangles(self, gc, triangles_array, colors_array,
+                               transform):
+        pass
 
     def draw_image(self, gc, x, y, im):
         pass
@@ -303,8 +191,7 @@ def show(block=None):
     interactive versus batch mode
     """
     for manager in Gcf.get_all_fig_managers():
-        manager.canvas.send_deepforge_update()
-        pass
+        plotting.emitter.mark_dirty(manager.canvas)
 
 
 def new_figure_manager(num, *args, **kwargs):
@@ -350,19 +237,25 @@ class FigureCanvasTemplate(FigureCanvasBase):
 
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_state = None
+
     def draw(self):
         """
         Draw the figure using the renderer
         """
         renderer = RendererTemplate(self.figure.dpi)
-        self.figure.draw(renderer)
-        self.send_deepforge_update()
+        with plotting.ignore_changes():
+            self.figure.draw(renderer)
+        plotting.emitter.mark_dirty(self)
 
     def send_deepforge_update(self):
-        state = self.figure_to_state()
-        # Probably should do some diff-ing if the state hasn't changed...
-        # TODO
-        print('deepforge-cmd PLOT ' + json.dumps(state, ignore_nan=True))
+        """Send the figure state (or the changes since the last update)"""
+        plotting.clear_changed(self.figure)
+        with plotting.ignore_changes():
+            state = self.figure_to_state()
+        self._last_state = plotting.send_update(state['id'], state, self._last_state)
 
     def figure_to_state(self):
         figure = self.figure
@@ -373,6 +266,7 @@ class FigureCanvasTemplate(FigureCanvasBase):
             state['title'] = self.figure._suptitle.get_text()
 
         state['axes'] = []
+        max_points = plotting.get_max_points(figure)
         # Get the data points
         for axes in figure.get_axes():
             axes_data = {}
@@ -396,9 +290,9 @@ class FigureCanvasTemplate(FigureCanvasBase):
                 lineDict = {}
                 if isinstance(line, Line3D):
                     points = line.get_data_3d()
-                    lineDict['points'] = np.transpose(points).tolist()
+                    lineDict['points'] = np.transpose(points)
                 else:
-                    lineDict['points'] = line.get_xydata().tolist()
+                    lineDict['points'] = plotting.decimate(line.get_xydata(), max_points)
                 lineDict['label'] = ''
                 lineDict['color'] = to_hex(line.get_color())
                 lineDict['marker'] = line.get_marker()
@@ -413,25 +307,23 @@ class FigureCanvasTemplate(FigureCanvasBase):
             # Line Collections
             for collection in axes.collections:
                 if isinstance(collection, LineCollection):
-                    axes_data['lines'].extend(self.process_line_collection(collection))
+                    axes_data['lines'].extend(self.process_line_collection(collection, max_points))
                 if isinstance(collection, PathCollection):
-                    axes_data['scatterPoints'].append(self.process_collection(axes, collection, force_pathtrans=axes.transAxes))
+                    axes_data['scatterPoints'].append(self.process_collection(axes, collection))
 
             # Image data
             for i, image in enumerate(axes.images):
                 imageDict = {}
-                properties_dict = image.properties()
-                imageDict['height'] = properties_dict['size'][0]
-                imageDict['width'] = properties_dict['size'][1]
-                imageDict['visible'] = properties_dict['visible']
-                (imageDict['rgbaMatrix'], imageDict['numChannels']) = self.umask_b64_encode(properties_dict['array'])
+                imageDict['height'], imageDict['width'] = image.get_size()
+                imageDict['visible'] = image.get_visible()
+                (imageDict['rgbaMatrix'], imageDict['numChannels']) = self.encode_rgba_matrix(image.get_array())
 
                 axes_data['images'].append(imageDict)
 
             state['axes'].append(axes_data)
         return state
 
-    def process_line_collection(self, collection):
+    def process_line_collection(self, collection, max_points=0):
         line_collections = []
         colors = collection.get_colors()
         ls = collection.get_dashes()
@@ -439,7 +331,7 @@ class FigureCanvasTemplate(FigureCanvasBase):
 
         for i, segment  in enumerate(collection.get_segments()):
             line_collection_data = dict()
-            line_collection_data['points'] = segment.tolist()
+            line_collection_data['points'] = plotting.decimate(segment, max_points)
             label = collection.get_label()
             if label is None:
                 line_collection_data['label'] = ''
@@ -452,38 +344,23 @@ class FigureCanvasTemplate(FigureCanvasBase):
             line_collections.append(line_collection_data)
         return line_collections
 
-    def process_collection(self, ax, collection,
-                           force_pathtrans=None,
-                           force_offsettrans=None):
-        fig = gcf()
-        fig.savefig(io.BytesIO(), format='png', dpi=fig.dpi)
-        close(fig)
-
-        (transform, transOffset,
-                 offsets, paths) = collection._prepare_points()
-        offset_coords, offsets = process_transform(
-                    transOffset, ax, offsets, force_trans=force_offsettrans)
-        processed_paths = [SVG_path(path) for path in paths]
-        processed_paths = [(process_transform(
-                    transform, ax, path[0], force_trans=force_pathtrans)[1], path[1])
-                                   for path in processed_paths]
-        path_transforms = collection.get_transforms()
-        styles = {'linewidth': collection.get_linewidths(),
-                  'facecolor': collection.get_facecolors(),
-                  'edgecolor': collection.get_edgecolors(),
-                  'alpha': collection._alpha,
-                  'zorder': collection.get_zorder()}
-
-        offset_dict = {"data": "before",
-                       "screen": "after"}
-        offset_order = offset_dict[collection.get_offset_position()]
-        coll_offsets = offsets
+    def process_collection(self, ax, collection):
+        """Extract the points, sizes and colors of a collection
+
+        The values are computed directly from the collection's offsets and
+        transforms so the figure does not need to be rendered first.
+        """
         if isinstance(collection, Path3DCollection):
             coll_offsets = self.get_3d_array(collection._offsets3d)
+        else:
+            offsets = ma.getdata(collection.get_offsets())
+            to_data = collection.get_offset_transform() - ax.transData
+            coll_offsets = to_data.transform(offsets)
 
+        collection.update_scalarmappable()
         return {
-            'color': self.colors_to_hex(styles['facecolor'].tolist()),
-            'points': coll_offsets.tolist(),
+            'color': self.colors_to_hex(collection.get_facecolors()),
+            'points': coll_offsets,
             'marker': '.',      #TODO: Detect markers from Paths
             'label': '',
             'width': self.convert_size_array(collection.get_sizes())
@@ -504,28 +381,19 @@ class FigureCanvasTemplate(FigureCanvasBase):
             return size
 
     def colors_to_hex(self, colors_list):
-        hex_colors = []
-        for color in colors_list:
-            hex_colors.append(to_hex(color, keep_alpha=True))
+        rgba = np.round(np.asarray(colors_list) * 255).astype(np.uint8)
+        hex_digits = rgba.tobytes().hex()
+        hex_colors = ['#' + hex_digits[i:i + 8]
+                      for i in range(0, len(hex_digits), 8)]
         if len(hex_colors) == 1:
             return hex_colors[0]
         return hex_colors
 
-    def umask_b64_encode(self, masked_array):
-        # Unmask invalid data if present
-        if masked_array.mask:
-            masked_array.fill_value = 0
-        image_array = masked_array.filled()
-        if np.all(np.where(image_array <= 1, True, False)):
-            array = (image_array * 255).astype(np.uint8)
-        else:
-            array = image_array.astype(np.uint8)
-        if not array.flags['C_CONTIGUOUS']:  # Needed for base64 encoding
-            array = array.copy(order='c')
-        if len(array.shape) == 2:  # In Case a grayscale Image
-            array = np.stack((array, array, array), axis=-1)
-        encoded_array = base64.b64encode(array)
-        return encoded_array, array.shape[-1]
+    def encode_rgba_matrix(self, array):
+        pixels = plotting.to_pixels(array)
+        if pixels.ndim == 2:  # In Case a grayscale Image
+            pixels = np.stack((pixels, pixels, pixels), axis=-1)
+        return plotting.b64encode(pixels), pixels.shape[-1]
 
     # You should provide a print_xxx function for every file format
     # you can write.
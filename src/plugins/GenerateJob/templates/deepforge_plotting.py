@@ -0,0 +1,662 @@
+"""
+Utilities shared by the deepforge matplotlib backends for sending figure
+updates to deepforge.
+"""
+import atexit
+import base64
+import collections
+import contextlib
+import datetime
+import gzip
+import hashlib
+import io
+import math
+import os
+import struct
+import sys
+import threading
+import time
+import warnings
+
+import numpy as np
+import numpy.ma as ma
+import simplejson as json
+from PIL import Image, features
+
+COMMAND_PREFIX = 'deepforge-cmd'
+
+# If DEEPFORGE_METADATA_FILE is set, commands are appended to it as frames (a
+# 4 byte payload length, a byte of flags and the payload) rather than printed
+# to stdout. DEEPFORGE_METADATA_COMPRESSION can be set to "gzip" to compress
+# payloads larger than MIN_COMPRESSED_SIZE.
+METADATA_FILE = os.environ.get('DEEPFORGE_METADATA_FILE')
+METADATA_COMPRESSION = os.environ.get('DEEPFORGE_METADATA_COMPRESSION', '').lower()
+MIN_COMPRESSED_SIZE = 1024
+FRAME_HEADER = struct.Struct('>IB')
+GZIP_FLAG = 1
+_frame_lock = threading.Lock()
+
+# Numeric arrays are sent as base64 encoded (little-endian) typed arrays
+# unless DEEPFORGE_PLOT_ENCODING is set to "json"
+ENCODING = os.environ.get('DEEPFORGE_PLOT_ENCODING', 'binary')
+MIN_BINARY_SIZE = 32
+
+# Lines with more vertices than DEEPFORGE_PLOT_MAX_POINTS are downsampled
+# before being sent (disabled by default). DEEPFORGE_PLOT_DECIMATION selects
+# the method: "lttb" (largest triangle three buckets) or "minmax".
+MAX_POINTS = int(os.environ.get('DEEPFORGE_PLOT_MAX_POINTS', 0))
+DECIMATION = os.environ.get('DEEPFORGE_PLOT_DECIMATION', 'lttb')
+
+# Images are sent as compressed data URIs ("png" or "webp"). If
+# DEEPFORGE_PLOT_IMAGE_DOWNSAMPLE is set, images larger than their axes are
+# reduced to the displayed size.
+IMAGE_FORMAT = os.environ.get('DEEPFORGE_PLOT_IMAGE_FORMAT', 'png').lower()
+IMAGE_DOWNSAMPLE = os.environ.get('DEEPFORGE_PLOT_IMAGE_DOWNSAMPLE', '').lower() \
+    in ('1', 'true', 'yes')
+IMAGE_CACHE_SIZE = 32
+_image_cache = collections.OrderedDict()
+
+# Figure updates are sent from a background thread at most once every
+# DEEPFORGE_PLOT_INTERVAL seconds. If 0, updates are sent synchronously.
+UPDATE_INTERVAL = float(os.environ.get('DEEPFORGE_PLOT_INTERVAL', 0.25))
+
+_tracking = threading.local()
+
+
+def send_command(cmd, fig_num, content):
+    """Send a metadata command (such as PLOT) to deepforge"""
+    command = f'{cmd} {fig_num} {dumps(content)}'
+    if METADATA_FILE:
+        write_frame(command.encode('utf-8'))
+    else:
+        # Write the command at once so it is not interleaved with other output
+        sys.stdout.write(f'{COMMAND_PREFIX} {command}\n')
+        sys.stdout.flush()
+
+
+def write_frame(payload):
+    """Append a length-prefixed frame to the metadata spool file"""
+    flags = 0
+    if METADATA_COMPRESSION == 'gzip' and len(payload) >= MIN_COMPRESSED_SIZE:
+        payload = gzip.compress(payload, compresslevel=6)
+        flags |= GZIP_FLAG
+
+    frame = FRAME_HEADER.pack(len(payload), flags) + payload
+    # Frames are appended with a single unbuffered write so frames from
+    # different threads (or forked processes) are not interleaved
+    with _frame_lock, open(METADATA_FILE, 'ab', buffering=0) as spool:
+        spool.write(frame)
+
+
+def send_update(fig_num, state, last_state=None):
+    """Send the figure state (or the changes since the last update)
+
+    Returns
+    -------
+    dict
+        The sent state. This should be passed as `last_state` next time.
+    """
+    if last_state is None:
+        send_command('PLOT', fig_num, state)
+    else:
+        changes = diff_states(last_state, state)
+        if changes:
+            send_command('PLOT_PATCH', fig_num, changes)
+    return state
+
+
+class UpdateEmitter:
+    """Send figure updates from a background thread
+
+    Figures are marked as dirty and the latest state of each dirty figure is
+    sent at most once per interval. Intermediate states are dropped when the
+    figure is updated faster than the interval (or writing to stdout is
+    slow). All dirty figures are sent on exit.
+
+    The figure canvases must implement `send_deepforge_update()`.
+    """
+
+    def __init__(self, interval=UPDATE_INTERVAL):
+        self.interval = interval
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self._send_lock = threading.Lock()
+        self._pending = threading.Event()
+        self._thread = None
+        self._pid = None
+        atexit.register(self.flush)
+
+    def mark_dirty(self, canvas):
+        """Schedule an update for the figure of the given canvas
+
+        Figures which have not changed since they were last sent are skipped.
+        """
+        if not has_changed(canvas.figure):
+            return
+
+        if self.interval <= 0:
+            with self._send_lock:
+                canvas.send_deepforge_update()
+            return
+
+        with self._lock:
+            self._dirty[canvas] = True
+        self._ensure_thread()
+        self._pending.set()
+
+    @contextlib.contextmanager
+    def exclusive(self, canvas):
+        """Send the updates of a figure directly (such as animation frames)
+
+        No updates are sent by the emitter while in this context and pending
+        updates of the given figure are dropped.
+        """
+        with self._send_lock:
+            with self._lock:
+                self._dirty.pop(canvas, None)
+            yield
+
+    def flush(self):
+        """Send the latest state of all dirty figures"""
+        with self._send_lock:
+            for canvas in self._pop_dirty():
+                self._try_send(canvas)
+
+    def _pop_dirty(self):
+        with self._lock:
+            canvases = list(self._dirty)
+            self._dirty.clear()
+        return canvases
+
+    def _ensure_thread(self):
+        # The thread is not copied when forking so each process needs its own
+        if self._thread is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name='deepforge-plotting', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            self._pending.wait()
+            self._pending.clear()
+            with self._send_lock:
+                failed = [
+                    canvas for canvas in self._pop_dirty()
+                    if not self._try_send(canvas)
+                ]
+            if failed:
+                # The figure may have been modified while being converted.
+                # Retry after the interval (or on exit).
+                with self._lock:
+                    for canvas in failed:
+                        self._dirty.setdefault(canvas, True)
+                self._pending.set()
+            time.sleep(self.interval)
+
+    def _try_send(self, canvas):
+        try:
+            canvas.send_deepforge_update()
+            return True
+        except Exception as err:
+            fig_num = getattr(canvas.manager, 'num', '')
+            warnings.warn(f'Unable to send update for figure {fig_num}: {err}')
+            return False
+
+
+emitter = UpdateEmitter()
+
+
+def has_changed(figure):
+    """Check if the figure has changed since `clear_changed` was called
+
+    Changes are detected using the figure's stale callback (which is called
+    when any of its artists are modified). Figures which were not tracked
+    yet are considered changed unless changes are currently ignored.
+    """
+    callback = figure.stale_callback
+    if getattr(callback, 'is_deepforge_tracker', False):
+        return getattr(figure, '_deepforge_changed', True)
+
+    def on_stale(fig, stale):
+        if stale and not getattr(_tracking, 'ignored', False):
+            fig._deepforge_changed = True
+        if callback is not None:
+            callback(fig, stale)
+
+    on_stale.is_deepforge_tracker = True
+    figure.stale_callback = on_stale
+    figure._deepforge_changed = not getattr(_tracking, 'ignored', False)
+    return figure._deepforge_changed
+
+
+def clear_changed(figure):
+    figure._deepforge_changed = False
+
+
+@contextlib.contextmanager
+def ignore_changes():
+    """Ignore figure changes made by the current thread (such as drawing)"""
+    ignored = getattr(_tracking, 'ignored', False)
+    _tracking.ignored = True
+    try:
+        yield
+    finally:
+        _tracking.ignored = ignored
+
+
+def dumps(content):
+    """Serialize the (possibly numpy containing) content to JSON"""
+    return json.dumps(content, ignore_nan=True, default=encode_value)
+
+
+def encode_value(value):
+    """Convert values unsupported by the JSON encoder"""
+    if isinstance(value, np.ndarray):
+        if ENCODING == 'binary' and value.size >= MIN_BINARY_SIZE:
+            encoded = encode_array(value)
+            if encoded is not None:
+                return encoded
+        return ma.filled(value.astype(object), None).tolist() \
+            if ma.is_masked(value) else value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def encode_array(array):
+    """Encode a numeric array as a base64 typed array
+
+    Returns
+    -------
+    dict or None
+        The encoded array with its "dtype", "shape" and base64 encoded data
+        ("bdata") as used by plotly. Invalid (masked or NaN) entries are
+        listed in "mask" as base64 encoded bits. None is returned for
+        non-numeric arrays.
+    """
+    if array.dtype.kind not in 'biuf':
+        return None
+
+    mask = ma.getmaskarray(array)
+    data = ma.getdata(array)
+    if data.dtype.kind == 'f':
+        mask = mask | ~np.isfinite(data)
+
+    dtype = get_binary_dtype(data)
+    encoded = {
+        'dtype': dtype,
+        'shape': ', '.join(str(dim) for dim in data.shape),
+        'bdata': b64encode(np.ascontiguousarray(data, dtype='<' + dtype)),
+    }
+    if mask.any():
+        encoded['mask'] = b64encode(np.packbits(mask.ravel(), bitorder='little'))
+    return encoded
+
+
+def get_binary_dtype(data):
+    if data.dtype.kind in 'biu':
+        info = np.iinfo(np.int32)
+        if data.size == 0 or (data.min() >= info.min and data.max() <= info.max):
+            return 'i4'
+        return 'f8'
+
+    # Use single precision if it can represent the values for display
+    finite = data[np.isfinite(data)]
+    if finite.size == 0:
+        return 'f4'
+    single = finite.astype(np.float32)
+    max_error = np.max(np.abs(single.astype(np.float64) - finite))
+    tolerance = 1e-6 * max(np.ptp(finite), np.max(np.abs(finite)) * 1e-3)
+    return 'f4' if max_error <= tolerance else 'f8'
+
+
+def b64encode(data):
+    return base64.b64encode(data).decode('ascii')
+
+
+def encode_image(array, max_size=None):
+    """Encode an image as a compressed data URI
+
+    Encoded images are cached by their content hash so an image which has
+    not changed is not compressed again.
+
+    Parameters
+    ----------
+    array : ndarray
+        The image data (with 1, 3 or 4 channels)
+    max_size : tuple (optional)
+        The (width, height) of the area the image is displayed in. Larger
+        images are downsampled by an integer factor to fit.
+
+    Returns
+    -------
+    dict
+        The content "hash", the data URI ("src") and the downsampling factor
+        ("scale")
+    """
+    pixels = to_pixels(array)
+    height, width = pixels.shape[:2]
+    scale = 1
+    if max_size is not None:
+        max_width, max_height = max_size
+        scale = max(math.ceil(width / max(max_width, 1)),
+                    math.ceil(height / max(max_height, 1)), 1)
+
+    digest = hashlib.sha1(pixels.data)
+    digest.update(f'{pixels.shape}{scale}{IMAGE_FORMAT}'.encode())
+    key = digest.hexdigest()
+    if key in _image_cache:
+        _image_cache.move_to_end(key)
+        return _image_cache[key]
+
+    image = Image.fromarray(pixels)
+    if scale > 1:
+        size = (math.ceil(width / scale), math.ceil(height / scale))
+        image = image.resize(size, Image.BOX)
+
+    image_format = IMAGE_FORMAT
+    if image_format == 'webp' and not features.check('webp'):
+        image_format = 'png'
+    options = {'lossless': True} if image_format == 'webp' else {}
+    buf = io.BytesIO()
+    image.save(buf, format=image_format, **options)
+    src = f'data:image/{image_format};base64,{b64encode(buf.getbuffer())}'
+
+    encoded = {'hash': key, 'src': src, 'scale': scale}
+    _image_cache[key] = encoded
+    if len(_image_cache) > IMAGE_CACHE_SIZE:
+        _image_cache.popitem(last=False)
+    return encoded
+
+
+def fingerprint(*values):
+    """Compute a hash of the given values (which may contain numpy arrays)"""
+    digest = hashlib.sha1()
+    _update_digest(digest, values)
+    return digest.hexdigest()
+
+
+def _update_digest(digest, value):
+    if isinstance(value, np.ndarray):
+        data = np.ascontiguousarray(ma.getdata(value))
+        digest.update(f'array{data.dtype}{data.shape}'.encode())
+        digest.update(data.data if data.dtype.kind != 'O' else repr(data).encode())
+        if ma.is_masked(value):
+            _update_digest(digest, ma.getmaskarray(value))
+    elif isinstance(value, (list, tuple)):
+        digest.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _update_digest(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+
+def to_pixels(array):
+    """Convert image data to contiguous uint8 pixels
+
+    Single channel images are kept as a single channel and fully opaque
+    alpha channels are dropped.
+    """
+    data = ma.filled(array, 0) if ma.is_masked(array) else ma.getdata(array)
+    if data.dtype != np.uint8:
+        data = np.nan_to_num(data)
+        if data.dtype.kind == 'f' and data.size and data.max() <= 1:
+            data = data * 255
+        data = np.clip(data, 0, 255).astype(np.uint8)
+
+    if data.ndim == 3 and data.shape[2] == 4 and np.all(data[..., 3] == 255):
+        data = data[..., :3]
+    if data.ndim == 3 and data.shape[2] == 1:
+        data = data[..., 0]
+    return np.ascontiguousarray(data)
+
+
+def get_max_points(figure):
+    """Get the point budget for each line in the given figure
+
+    The budget can be set for a single figure using its
+    `deepforge_max_points` attribute. Otherwise, MAX_POINTS is used.
+    """
+    return getattr(figure, 'deepforge_max_points', MAX_POINTS)
+
+
+def decimate(points, max_points, method=None, xlim=None):
+    """Downsample the vertices of a line while preserving its shape
+
+    The original data is not modified so a region of the line can be
+    recomputed at a higher resolution (using `xlim`) when zooming.
+
+    Parameters
+    ----------
+    points : ndarray
+        The (N, 2) array of line vertices
+    max_points : int
+        The maximum number of vertices to return. No downsampling is
+        performed if this is not positive.
+    method : str (optional)
+        Either "lttb" or "minmax". Defaults to DECIMATION
+    xlim : tuple (optional)
+        Only use the vertices within this x range (and their neighbors)
+
+    Returns
+    -------
+    ndarray
+        The selected vertices
+    """
+    points = np.asarray(points)
+    if points.ndim != 2 or points.shape[1] != 2:
+        return points
+
+    if xlim is not None:
+        x = points[:, 0]
+        inside = np.flatnonzero((x >= xlim[0]) & (x <= xlim[1]))
+        if inside.size:
+            points = points[max(inside[0] - 1, 0):inside[-1] + 2]
+
+    if max_points <= 0 or len(points) <= max(max_points, 3):
+        return points
+
+    method = method or DECIMATION
+    if method == 'lttb':
+        indices = lttb_indices(points, max_points)
+    elif method == 'minmax':
+        indices = minmax_indices(points[:, 1], max_points)
+    else:
+        raise ValueError(f'Unsupported decimation method: {method}')
+    return points[indices]
+
+
+def lttb_indices(points, max_points):
+    """Select vertices using largest triangle three buckets
+
+    The first and last vertices are always kept. The remaining vertices are
+    split into buckets and the vertex forming the largest triangle with the
+    previously selected vertex and the mean of the next bucket is kept.
+    """
+    n_out = max(max_points, 3)
+    count = len(points)
+    x, y = points[:, 0], points[:, 1]
+    edges = np.linspace(1, count - 1, n_out - 1).astype(int)
+
+    finite = np.isfinite(x) & np.isfinite(y)
+    bucket_sum = lambda values: np.diff(
+        np.concatenate([[0], np.cumsum(np.where(finite, values, 0))])[edges])
+    counts = np.maximum(bucket_sum(np.ones(count)), 1)
+    mean_x = np.append(bucket_sum(x) / counts, x[-1])
+    mean_y = np.append(bucket_sum(y) / counts, y[-1])
+
+    indices = np.empty(n_out, dtype=int)
+    indices[0], indices[-1] = 0, count - 1
+    selected = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        ax, ay = x[selected], y[selected]
+        area = np.abs((ax - mean_x[i + 1]) * (y[start:end] - ay) -
+                      (ax - x[start:end]) * (mean_y[i + 1] - ay))
+        selected = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        indices[i + 1] = selected
+    return indices
+
+
+def minmax_indices(values, max_points):
+    """Select the minimum and maximum value in each bucket"""
+    count = len(values)
+    n_buckets = max((max_points - 2) // 2, 1)
+    bucket_size = -(-count // n_buckets)
+    buckets = np.minimum(np.arange(n_buckets * bucket_size), count - 1)\
+        .reshape(n_buckets, bucket_size)
+    bucket_values = values[buckets]
+    finite = np.isfinite(bucket_values)
+    mins = np.argmin(np.where(finite, bucket_values, np.inf), axis=1)
+    maxs = np.argmax(np.where(finite, bucket_values, -np.inf), axis=1)
+    rows = np.arange(n_buckets)
+    indices = np.concatenate([
+        [0, count - 1],
+        buckets[rows, mins],
+        buckets[rows, maxs],
+    ])
+    return np.unique(indices)
+
+
+def diff_states(old, new, path=()):
+    """Compute the operations needed to update `old` to `new`
+
+    Arrays and lists which have only grown are sent as "append" operations
+    so the size of an update is proportional to the new data rather than the
+    entire history of the figure.
+
+    Parameters
+    ----------
+    old : dict
+        The previously sent state
+    new : dict
+        The current state
+    path : tuple (optional)
+        The keys and indices of the (nested) values being compared
+
+    Returns
+    -------
+    list
+        Operations of the form [op, path, value] where op is one of "set",
+        "append", "truncate" (value is the new length) or "delete"
+    """
+    if old is new:
+        return []
+
+    if is_encoded_array(old) or is_encoded_array(new):
+        if is_encoded_array(old) and is_encoded_array(new) and old == new:
+            return []
+        # Decode the arrays (encoded by plotly) so appended values are found
+        (old_array, new_array) = (decode_array(old), decode_array(new))
+        if old_array is None or new_array is None:
+            return [['set', list(path), new]]
+        return diff_arrays(old_array, new_array, path)
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key, value in new.items():
+            if key in old:
+                ops.extend(diff_states(old[key], value, path + (key,)))
+            else:
+                ops.append(['set', list(path + (key,)), value])
+        ops.extend(['delete', list(path + (key,)), None]
+                   for key in old if key not in new)
+        return ops
+
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        return diff_arrays(old, new, path)
+
+    if is_sequence(old) and is_sequence(new):
+        ops = []
+        common_len = min(len(old), len(new))
+        for i in range(common_len):
+            ops.extend(diff_states(old[i], new[i], path + (i,)))
+        if len(new) > common_len:
+            ops.append(['append', list(path), list(new[common_len:])])
+        elif len(old) > common_len:
+            ops.append(['truncate', list(path), common_len])
+        return ops
+
+    if not values_equal(old, new):
+        return [['set', list(path), new]]
+
+    return []
+
+
+def diff_arrays(old, new, path):
+    old = np.asarray(old)
+    new = np.asarray(new)
+    if old.shape == new.shape and arrays_equal(old, new):
+        return []
+
+    can_append = old.ndim > 0 and new.ndim == old.ndim and \
+        old.shape[1:] == new.shape[1:] and len(old) < len(new) and \
+        arrays_equal(new[:len(old)], old)
+
+    if can_append:
+        return [['append', list(path), new[len(old):]]]
+
+    return [['set', list(path), new]]
+
+
+def arrays_equal(a, b):
+    if a.dtype.kind in 'fc' and b.dtype.kind in 'fc':
+        same = (a == b) | (np.isnan(a) & np.isnan(b))
+        return bool(np.all(same))
+    return np.array_equal(a, b)
+
+
+def is_encoded_array(value):
+    """Check if the value is a typed array encoded by plotly"""
+    return isinstance(value, dict) and 'bdata' in value and 'dtype' in value
+
+
+def decode_array(value):
+    """Decode a typed array encoded by plotly (or `encode_array`)
+
+    Returns
+    -------
+    ndarray or None
+        The decoded array. Invalid entries of float arrays are NaN. None is
+        returned if the value is not an array or cannot be decoded.
+    """
+    if isinstance(value, np.ndarray):
+        return value
+    if not is_encoded_array(value):
+        return None
+
+    try:
+        dtype = np.dtype('<' + value['dtype'])
+        array = np.frombuffer(base64.b64decode(value['bdata']), dtype=dtype)
+    except (TypeError, ValueError):
+        return None
+
+    shape = value.get('shape')
+    if isinstance(shape, str):
+        shape = [int(dim) for dim in shape.split(',')]
+    if shape is not None:
+        array = array.reshape(shape)
+
+    if 'mask' in value:
+        if dtype.kind != 'f':
+            return None
+        mask = np.unpackbits(np.frombuffer(base64.b64decode(value['mask']), np.uint8),
+                             count=array.size, bitorder='little')
+        array = np.where(mask.reshape(array.shape).astype(bool), np.nan, array)
+    return array
+
+
+def is_sequence(value):
+    return isinstance(value, (list, tuple))
+
+
+def values_equal(a, b):
+    is_nan = lambda v: isinstance(v, float) and math.isnan(v)
+    if is_nan(a) and is_nan(b):
+        return True
+    return type(a) == type(b) and a == b
@@ -6,6 +6,7 @@ define([
     'text!./deepforge.ejs',
     'text!./plotly_backend.py',
     'text!./deepforge__init__.py',
+    'text!./deepforge_plotting.py',
     'text!./serialize.ejs',
     'text!./deserialize.ejs',
     'text!./utils.build.js',
@@ -17,6 +18,7 @@ define([
     DEEPFORGE_SERIALIZATION,
     MATPLOTLIB_BACKEND,
     DEEPFORGE_INIT,
+    DEEPFORGE_PLOTTING,
     SERIALIZE,
     DESERIALIZE,
     UTILS,
@@ -31,6 +33,7 @@ define([
         DEEPFORGE_SERIALIZATION,
         MATPLOTLIB_BACKEND,
         DEEPFORGE_INIT,
+        DEEPFORGE_PLOTTING,
         DESERIALIZE,
         UTILS,
         WORKER_ENV,
@@ -4,35 +4,49 @@ Plotly backend for matplotlib
 from __future__ import (absolute_import, division, print_function,
                         unicode_literals)
 import six
-import io
-import base64
 import math
+import os
+import warnings
+import weakref
+from functools import partial
 
 import numpy as np
 import numpy.ma as ma
 
 import matplotlib
 from matplotlib._pylab_helpers import Gcf
+from matplotlib.animation import Animation
 from matplotlib.backend_bases import (
      FigureCanvasBase, FigureManagerBase, GraphicsContextBase, RendererBase
 )
+from matplotlib.backends.backend_agg import RendererAgg
 import matplotlib.pyplot as plt
 from matplotlib.lines import Line2D
 from matplotlib.figure import Figure
 from matplotlib import transforms, collections
 from matplotlib import ticker
+from matplotlib.colors import Normalize
+from matplotlib.container import BarContainer
 from matplotlib.path import Path
-from matplotlib.patches import PathPatch
+from matplotlib.patches import PathPatch, Rectangle
 from mpl_toolkits.mplot3d.axes3d import Axes3D
 from mpl_toolkits.mplot3d.axis3d import ZAxis
 from mpl_toolkits.mplot3d.art3d import Path3DCollection, Line3D
 
-from PIL import Image
-
 import plotly.graph_objects as go
 from plotly.matplotlylib import mplexporter, PlotlyRenderer
 from plotly.matplotlylib import mpltools
 
+from deepforge import plotting
+
+
+# Series with more points than DEEPFORGE_PLOT_WEBGL_THRESHOLD are drawn using
+# WebGL (scattergl). 3D series are downsampled to DEEPFORGE_PLOT_MAX_POINTS_3D.
+WEBGL_THRESHOLD = int(os.environ.get('DEEPFORGE_PLOT_WEBGL_THRESHOLD', 5000))
+MAX_POINTS_3D = int(os.environ.get('DEEPFORGE_PLOT_MAX_POINTS_3D', 100000))
+
+# Animation frames are sent in batches of DEEPFORGE_PLOT_FRAME_BATCH_SIZE
+FRAME_BATCH_SIZE = int(os.environ.get('DEEPFORGE_PLOT_FRAME_BATCH_SIZE', 50))
 
 PLOTLY_3D_MARKER_SYMBOLS = (
     'square',
@@ -203,12 +217,307 @@ def mpl_to_plotly(fig):
         The converted plotly Figure
     """
     renderer = DeepforgePlotlyRenderer()
-    exporter = mplexporter.Exporter(renderer)
+    exporter = DeepforgeExporter(renderer)
     exporter.run(fig)
     renderer.crawl_3d_labels(fig)
     return renderer.plotly_fig
 
 
+def mpl_to_plotly_json(fig, trace_cache=None):
+    """Convert matplotlib figure to the JSON of a plotly figure
+
+    Parameters
+    ----------
+    fig : matplotlib.pyplot.Figure
+        The matplotlib figure
+    trace_cache : weakref.WeakKeyDictionary (optional)
+        The plotly traces of previously converted artists. The traces of
+        unchanged artists are reused rather than converted again.
+
+    Returns
+    -------
+    dict
+        The JSON of the converted plotly figure
+    """
+    renderer = DeepforgePlotlyRenderer()
+    exporter = DeepforgeExporter(renderer, trace_cache=trace_cache)
+    exporter.run(fig)
+    renderer.crawl_3d_labels(fig)
+    return exporter.to_plotly_json()
+
+
+def get_mesh_coordinates(mesh):
+    """Get the (M + 1, N + 1, 2) vertices of a QuadMesh"""
+    if hasattr(mesh, 'get_coordinates'):
+        return mesh.get_coordinates()
+    return mesh._coordinates
+
+
+def to_rgba_strings(colors):
+    """Convert RGBA colors to plotly colors (or a single color if all equal)"""
+    colors = np.atleast_2d(colors)
+    rgba = [
+        'rgba({0}, {1}, {2}, {3})'.format(*rgb, alpha)
+        for (rgb, alpha) in zip(np.round(colors[:, :3] * 255).astype(int), colors[:, 3])
+    ]
+    if len(set(rgba)) == 1:
+        return rgba[0]
+    return rgba
+
+
+def collapse(values):
+    """Replace an array of (nearly) identical values with a single value"""
+    if len(values) and np.allclose(values, values[0], rtol=1e-9, atol=0):
+        return values[0].item()
+    return values
+
+
+def get_animation_frame(name, last_state, state):
+    """Get the plotly frame for the changes between two animation states
+
+    Only the traces (and their attributes) which changed since the previous
+    frame are included so the frames are meant to be played in order.
+    """
+    last_traces = last_state['data']
+    traces = []
+    data = []
+    for (i, trace) in enumerate(state['data']):
+        last_trace = last_traces[i] if i < len(last_traces) else {}
+        changes = {
+            key: value for (key, value) in trace.items()
+            if key not in last_trace or plotting.diff_states(last_trace[key], value)
+        }
+        if changes:
+            changes['type'] = trace.get('type')
+            traces.append(i)
+            data.append(changes)
+
+    frame = {'name': name, 'data': data, 'traces': traces}
+    if plotting.diff_states(last_state['layout'], state['layout']):
+        frame['layout'] = state['layout']
+    return frame
+
+
+def get_animation_controls(state, interval):
+    """Get the plotly buttons for playing the animation frames"""
+    # Scatter traces can be animated without redrawing the entire plot
+    redraw = any(
+        trace.get('type') not in ('scatter', 'scattergl') for trace in state['data']
+    )
+    play_options = {
+        'frame': {'duration': interval, 'redraw': redraw},
+        'transition': {'duration': 0},
+        'fromcurrent': True,
+    }
+    return [{
+        'type': 'buttons',
+        'showactive': False,
+        'buttons': [{
+            'label': 'Play',
+            'method': 'animate',
+            'args': [None, play_options],
+        }],
+    }]
+
+
+class DeepforgeExporter(mplexporter.Exporter):
+    """Exporter which caches the plotly traces of lines, collections, images
+
+    Images are passed to the renderer without writing a PNG; the renderer
+    compresses the image data itself. Lines which have only grown since they
+    were converted reuse their cached trace with the new x, y columns (so
+    only the appended points are sent in the next figure update).
+    """
+
+    def __init__(self, renderer, trace_cache=None):
+        super().__init__(renderer, close_mpl=False)
+        self.trace_cache = trace_cache
+        self.converted = []
+        self.reused = []
+        self.extended = []
+
+    def run(self, fig):
+        """Export the figure after laying it out (if needed)
+
+        Unlike the mplexporter, the figure is not rendered to a PNG to
+        compute its layout (and is not closed). If the figure has not changed
+        since it was last drawn, it is exported without another layout pass.
+        """
+        if fig.stale:
+            with plotting.ignore_changes():
+                fig.draw(RendererTemplate(fig.dpi))
+        self.crawl_fig(fig)
+
+    def draw_line(self, ax, line, force_trans=None):
+        draw = partial(super().draw_line, ax, line, force_trans=force_trans)
+        if force_trans is None:  # not a legend entry
+            self.draw_cached(ax, line, draw)
+        else:
+            draw()
+
+    def crawl_ax(self, ax):
+        self.bar_patches = {
+            patch: container
+            for container in ax.containers if isinstance(container, BarContainer)
+            for patch in container.patches
+        }
+        self.drawn_containers = {}
+        super().crawl_ax(ax)
+
+    def draw_patch(self, ax, patch, force_trans=None):
+        """Draw the patches of a bar container as a single trace"""
+        container = self.bar_patches.get(patch) if force_trans is None else None
+        if container is None:
+            return super().draw_patch(ax, patch, force_trans=force_trans)
+
+        if id(container) not in self.drawn_containers:
+            is_drawn = self.renderer.draw_bar_container(container)
+            self.drawn_containers[id(container)] = is_drawn
+        if not self.drawn_containers[id(container)]:
+            super().draw_patch(ax, patch)
+
+    def draw_collection(self, ax, collection, force_pathtrans=None,
+                        force_offsettrans=None):
+        if force_pathtrans is None and force_offsettrans is None:
+            draw = partial(self.draw_collection_traces, ax, collection)
+            self.draw_cached(ax, collection, draw)
+        else:
+            super().draw_collection(ax, collection,
+                                    force_pathtrans=force_pathtrans,
+                                    force_offsettrans=force_offsettrans)
+
+    def draw_collection_traces(self, ax, collection):
+        """Draw quad meshes and rectangle collections as single traces"""
+        is_drawn = False
+        if isinstance(collection, collections.QuadMesh):
+            is_drawn = self.renderer.draw_heatmap(collection)
+        elif isinstance(collection, collections.PatchCollection):
+            is_drawn = self.renderer.draw_rectangles(collection)
+
+        if not is_drawn:
+            super().draw_collection(ax, collection)
+
+    def draw_image(self, ax, image):
+        draw = partial(
+            self.renderer.draw_image,
+            imdata=None,
+            extent=image.get_extent(),
+            coordinates='data',
+            style={'alpha': image.get_alpha(), 'zorder': image.get_zorder()},
+            mplobj=image,
+        )
+        self.draw_cached(ax, image, draw)
+
+    def draw_cached(self, ax, artist, draw):
+        """Reuse the traces of an unchanged artist (or draw and cache them)"""
+        key = self.get_fingerprint(ax, artist) if self.trace_cache is not None else None
+        cached = self.trace_cache.get(artist) if key is not None else None
+        data = self.renderer.plotly_fig.data
+        if cached is not None and cached[0] == key:
+            self.reused.append((len(data), cached[1]))
+        elif cached is not None and self.can_extend(ax, artist, key, cached):
+            xy = np.array(artist.get_xydata())
+            traces = [dict(cached[1][0], x=xy[:, 0], y=xy[:, 1])]
+            self.reused.append((len(data), traces))
+            self.extended.append((artist, (key, traces, len(xy))))
+        else:
+            start = len(data)
+            draw()
+            end = len(self.renderer.plotly_fig.data)
+            length = self.get_extendable_length(artist)
+            if key is not None:
+                self.converted.append((artist, key, start, end, length))
+
+    def get_extendable_length(self, artist):
+        """Get the number of vertices of a line which may be extended later"""
+        is_extendable = isinstance(artist, Line2D) and \
+            not isinstance(artist, Line3D) and not self.renderer.x_is_mpl_date
+        return len(artist.get_xydata()) if is_extendable else None
+
+    def can_extend(self, ax, artist, key, cached):
+        """Check if a line only had points appended since it was cached
+
+        The cached trace can then be reused with the new columns as long as
+        the line is not decimated and does not switch to (or from) WebGL.
+        """
+        (cached_key, traces, length) = cached
+        is_line_trace = length is not None and len(traces) == 1 and \
+            traces[0].get('type') in ('scatter', 'scattergl')
+        if not is_line_trace or cached_key[0] != key[0]:
+            return False
+
+        xy = artist.get_xydata()
+        max_points = plotting.get_max_points(ax.figure)
+        is_decimated = max_points > 0 and len(xy) > max(max_points, 3)
+        is_same_type = (len(xy) > WEBGL_THRESHOLD) == (length > WEBGL_THRESHOLD)
+        return len(xy) > length and is_same_type and not is_decimated and \
+            plotting.fingerprint(xy[:length]) == cached_key[1]
+
+    def get_fingerprint(self, ax, artist):
+        """Hash the data and style of an artist (or None if not cacheable)
+
+        The style and the data of (2D) lines are hashed separately so lines
+        which have been extended can be detected.
+        """
+        renderer = self.renderer
+        values = [
+            type(artist).__name__, artist.get_label(), artist.get_alpha(),
+            artist.get_visible(), artist.get_zorder(),
+            renderer.axis_ct, renderer.x_is_mpl_date,
+        ]
+        if isinstance(artist, Line2D):
+            if not artist.get_transform().contains_branch(ax.transData):
+                return None
+            values.extend([
+                artist.get_color(), artist.get_linewidth(),
+                artist.get_linestyle(), artist.get_drawstyle(),
+                artist.get_marker(), artist.get_markersize(),
+                artist.get_markeredgecolor(), artist.get_markerfacecolor(),
+                artist.get_markeredgewidth(),
+                plotting.get_max_points(ax.figure),
+            ])
+            if not isinstance(artist, Line3D):
+                return (plotting.fingerprint(values), plotting.fingerprint(artist.get_xydata()))
+            values.append(artist.get_data_3d())
+        elif isinstance(artist, collections.Collection):
+            is_data = artist.get_transform().contains_branch(ax.transData) or \
+                artist.get_offset_transform().contains_branch(ax.transData)
+            if not is_data:
+                return None
+            artist.update_scalarmappable()
+            if isinstance(artist, collections.QuadMesh):
+                paths = get_mesh_coordinates(artist)
+            else:
+                paths = [path.vertices for path in artist.get_paths()]
+            values.extend([
+                artist.get_offsets(), getattr(artist, '_offsets3d', None),
+                paths, artist.get_array(),
+                artist.get_facecolors(), artist.get_edgecolors(),
+                artist.get_linewidths(), artist.get_linestyles(),
+                artist.get_sizes() if hasattr(artist, 'get_sizes') else None,
+            ])
+        else:
+            artist.autoscale_None()
+            values.extend([
+                artist.get_array(), artist.get_extent(), artist.get_cmap().name,
+                artist.norm.vmin, artist.norm.vmax,
+                ax.get_window_extent().bounds if plotting.IMAGE_DOWNSAMPLE else None,
+            ])
+        return plotting.fingerprint(values)
+
+    def to_plotly_json(self):
+        """Get the JSON of the exported figure (including reused traces)"""
+        state = self.renderer.plotly_fig.to_plotly_json()
+        data = state['data']
+        for (artist, key, start, end, length) in self.converted:
+            self.trace_cache[artist] = (key, data[start:end], length)
+        for (artist, entry) in self.extended:
+            self.trace_cache[artist] = entry
+        for (index, traces) in reversed(self.reused):
+            data[index:index] = traces
+        return state
+
+
 class DeepforgePlotlyRenderer(PlotlyRenderer):
     """PlotlyRenderer capable of handling images, 3D Plots
 
@@ -218,19 +527,180 @@ class DeepforgePlotlyRenderer(PlotlyRenderer):
     """
 
     def draw_image(self, **props):
-        """Write base64 encoded images into plotly figure"""
-        imdata = props['imdata']
-        base64_decoded = base64.b64decode(imdata)
-        image = Image.open(io.BytesIO(base64_decoded))
-        image_np = np.array(image)
+        """Write compressed images (as data URIs) into plotly figure"""
+        image = props['mplobj']
+        array = image.get_array()
+        if array.ndim == 2:
+            image.autoscale_None()
+            array = image.to_rgba(array, bytes=True)
+
+        max_size = None
+        if plotting.IMAGE_DOWNSAMPLE:
+            bbox = image.axes.get_window_extent()
+            max_size = (bbox.width, bbox.height)
+
+        encoded = plotting.encode_image(array, max_size)
         self.plotly_fig.add_trace(
             go.Image(
-                z=image_np,
+                source=encoded['src'],
+                dx=encoded['scale'],
+                dy=encoded['scale'],
                 xaxis='x{0}'.format(self.axis_ct),
                 yaxis='y{0}'.format(self.axis_ct),
             ),
         )
 
+    def draw_bar_container(self, container):
+        """Draw the bars of a container (from bar or hist) as one bar trace
+
+        Returns
+        -------
+        bool
+            False if the bars could not be drawn as a single trace
+        """
+        patches = container.patches
+        ax = self.current_mpl_ax
+        is_supported = len(patches) > 0 and not self.x_is_mpl_date and \
+            all(isinstance(patch, Rectangle) for patch in patches) and \
+            patches[0].get_transform().contains_branch(ax.transData)
+        if not is_supported:
+            return False
+
+        x = np.array([patch.get_x() for patch in patches])
+        y = np.array([patch.get_y() for patch in patches])
+        widths = np.array([patch.get_width() for patch in patches])
+        heights = np.array([patch.get_height() for patch in patches])
+        orientation = getattr(container, 'orientation', None)
+        if orientation is None:
+            is_vertical = np.allclose(widths, widths[0]) or \
+                not np.allclose(heights, heights[0])
+            orientation = 'vertical' if is_vertical else 'horizontal'
+
+        facecolors = np.array([patch.get_facecolor() for patch in patches])
+        first = patches[0]
+        self.add_bar_trace(
+            x, y, widths, heights, orientation, facecolors,
+            first.get_edgecolor(), first.get_linewidth(), container.get_label(),
+        )
+        return True
+
+    def draw_rectangles(self, collection):
+        """Draw a collection of axis-aligned rectangles as one bar trace
+
+        Returns
+        -------
+        bool
+            False if the collection does not only contain rectangles
+        """
+        ax = self.current_mpl_ax
+        paths = collection.get_paths()
+        offsets = collection.get_offsets()
+        is_supported = len(paths) > 0 and not self.x_is_mpl_date and \
+            collection.get_transform() is ax.transData and \
+            not np.any(offsets) and \
+            len(set(len(path.vertices) for path in paths)) == 1
+        if not is_supported:
+            return False
+
+        vertices = np.array([path.vertices for path in paths])
+        x0, x1 = vertices[..., 0].min(axis=1), vertices[..., 0].max(axis=1)
+        y0, y1 = vertices[..., 1].min(axis=1), vertices[..., 1].max(axis=1)
+        on_edges = lambda values, low, high: np.isclose(values, low[:, None]) | \
+            np.isclose(values, high[:, None])
+        is_rectangle = on_edges(vertices[..., 0], x0, x1).all() and \
+            on_edges(vertices[..., 1], y0, y1).all()
+        if not is_rectangle:
+            return False
+
+        collection.update_scalarmappable()
+        self.add_bar_trace(
+            x0, y0, x1 - x0, y1 - y0, 'vertical', collection.get_facecolors(),
+            collection.get_edgecolors(), collection.get_linewidths()[0],
+            collection.get_label(),
+        )
+        return True
+
+    def draw_bars(self, bars):
+        """Draw the remaining bars (not drawn as a single trace) per container"""
+        for container in self.bar_containers:
+            trace = [props for props in bars if props['mplobj'] in container]
+            if trace:
+                self.draw_bar(trace)
+
+    def add_bar_trace(self, x, y, widths, heights, orientation, facecolors,
+                      edgecolors, linewidth, label):
+        edgecolors = np.atleast_2d(edgecolors)
+        line = dict(width=linewidth)
+        if len(edgecolors):
+            line['color'] = to_rgba_strings(edgecolors[:1])
+        if orientation == 'vertical':
+            positions = dict(x=x + widths / 2, y=heights,
+                             width=collapse(widths), base=collapse(y))
+        else:
+            positions = dict(y=y + heights / 2, x=widths,
+                             width=collapse(heights), base=collapse(x))
+
+        self.plotly_fig.add_trace(
+            go.Bar(
+                orientation='v' if orientation == 'vertical' else 'h',
+                name=str(label),
+                marker=dict(color=to_rgba_strings(facecolors), line=line),
+                xaxis='x{0}'.format(self.axis_ct),
+                yaxis='y{0}'.format(self.axis_ct),
+                **positions,
+            )
+        )
+        # Bars are positioned explicitly (as in matplotlib) rather than grouped
+        self.plotly_fig['layout']['barmode'] = 'overlay'
+
+    def draw_heatmap(self, mesh):
+        """Draw a rectilinear QuadMesh (such as from hist2d) as a heatmap
+
+        Returns
+        -------
+        bool
+            False if the mesh could not be drawn as a heatmap
+        """
+        coordinates = get_mesh_coordinates(mesh)
+        x_edges = coordinates[0, :, 0]
+        y_edges = coordinates[:, 0, 1]
+        is_rectilinear = not self.x_is_mpl_date and \
+            mesh.get_transform().contains_branch(self.current_mpl_ax.transData) and \
+            np.allclose(coordinates[..., 0], x_edges[None, :]) and \
+            np.allclose(coordinates[..., 1], y_edges[:, None])
+        if not is_rectilinear or mesh.get_array() is None:
+            return False
+
+        values = ma.masked_invalid(ma.asarray(mesh.get_array(), dtype=float))
+        values = values.reshape(len(y_edges) - 1, len(x_edges) - 1)
+        mesh.autoscale_None()
+        norm = mesh.norm
+        if type(norm) is Normalize:
+            zmin, zmax = norm.vmin, norm.vmax
+        else:
+            values, zmin, zmax = norm(values), 0, 1
+
+        cmap = mesh.get_cmap()
+        levels = np.linspace(0, 1, 11)
+        colorscale = [
+            [level, color]
+            for (level, color) in zip(levels, to_rgba_strings(cmap(levels)))
+        ]
+        self.plotly_fig.add_trace(
+            go.Heatmap(
+                x=x_edges,
+                y=y_edges,
+                z=ma.filled(values, np.nan),
+                zmin=zmin,
+                zmax=zmax,
+                colorscale=colorscale,
+                showscale=False,
+                xaxis='x{0}'.format(self.axis_ct),
+                yaxis='y{0}'.format(self.axis_ct),
+            )
+        )
+        return True
+
     def get_3d_array(self, masked_array_tuple):
         """convert a masked array into an array of 3d-coordinates"""
         values = []
@@ -275,7 +745,36 @@ class DeepforgePlotlyRenderer(PlotlyRenderer):
                 props['coordinates'] = 'data'
                 props['data'] = props['mplobj'].get_xydata()
 
-            super().draw_marked_line(**props)
+            if props['coordinates'] == 'data' and not self.x_is_mpl_date:
+                self.draw_marked_line_columns(**props)
+            else:
+                super().draw_marked_line(**props)
+
+    def draw_marked_line_columns(self, **props):
+        """Draw a line passing the x, y values as numpy columns to plotly
+
+        Lines (not markers) are downsampled to the figure's point budget and
+        large series are drawn using WebGL.
+        """
+        data = np.asarray(props['data']).reshape(-1, 2)
+        if props['linestyle']:
+            figure = props['mplobj'].figure
+            data = plotting.decimate(data, plotting.get_max_points(figure))
+        trace_count = len(self.plotly_fig.data)
+        super().draw_marked_line(**dict(props, data=data[:0]))
+        if len(self.plotly_fig.data) > trace_count:
+            trace = self.plotly_fig.data[-1]
+            if len(data) > WEBGL_THRESHOLD:
+                self.plotly_fig.data = self.plotly_fig.data[:-1]
+                self.plotly_fig.add_trace(go.Scattergl(
+                    trace.to_plotly_json(),
+                    x=data[:, 0],
+                    y=data[:, 1],
+                    skip_invalid=True,
+                ))
+            else:
+                trace.x = data[:, 0]
+                trace.y = data[:, 1]
 
     def draw_3d_collection(self, **props):
         """Draw 3D collection for scatter plots"""
@@ -309,6 +808,9 @@ class DeepforgePlotlyRenderer(PlotlyRenderer):
             )
 
         if props["coordinates"] == "data":
+            data = np.asarray(props["data"]).reshape(-1, 3)
+            if len(data) > MAX_POINTS_3D > 0:
+                data = data[::math.ceil(len(data) / MAX_POINTS_3D)]
             scatter_plot = go.Scatter3d(
                 mode=mode,
                 name=(
@@ -316,9 +818,9 @@ class DeepforgePlotlyRenderer(PlotlyRenderer):
                     if isinstance(props["label"], six.string_types)
                     else props["label"]
                 ),
-                x=[xyz_pair[0] for xyz_pair in props["data"]],
-                y=[xyz_pair[1] for xyz_pair in props["data"]],
-                z=[xyz_pair[2] for xyz_pair in props["data"]],
+                x=data[:, 0],
+                y=data[:, 1],
+                z=data[:, 2],
                 scene='scene{}'.format(self.axis_ct),
                 line=line,
                 marker=marker,
@@ -536,34 +1038,33 @@ class RendererTemplate(RendererBase):
     documentation of the classes methods.
     """
     def __init__(self, dpi):
+        super().__init__()
         self.dpi = dpi
+        self._text_renderer = None
 
     def draw_path(self, gc, path, transform, rgbFace=None):
         pass
 
-    # draw_markers is optional, and we get more correct relative
-    # timings by leaving it out.  backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_markers(self, gc, marker_path, marker_trans, path, trans,
-#                      rgbFace=None):
-#         pass
-
-    # draw_path_collection is optional, and we get more correct
-    # relative timings by leaving it out. backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_path_collection(self, gc, master_transform, paths,
-#                              all_transforms, offsets, offsetTrans,
-#                              facecolors, edgecolors, linewidths, linestyles,
-#                              antialiaseds):
-#         pass
-
-    # draw_quad_mesh is optional, and we get more correct
-    # relative timings by leaving it out.  backend implementers concerned with
-    # performance will probably want to implement it
-#     def draw_quad_mesh(self, gc, master_transform, meshWidth, meshHeight,
-#                        coordinates, offsets, offsetTrans, facecolors,
-#                        antialiased, edgecolors):
-#         pass
+    # The following are optional but the default implementations draw each
+    # marker/path separately which is slow for large collections.
+    def draw_markers(self, gc, marker_path, marker_trans, path, trans,
+                     rgbFace=None):
+        pass
+
+    def draw_path_collection(self, gc, master_transform, paths,
+                             all_transforms, offsets, offsetTrans,
+                             facecolors, edgecolors, linewidths, linestyles,
+                             antialiaseds, *args, **kwargs):
+        pass
+
+    def draw_quad_mesh(self, gc, master_transform, meshWidth, meshHeight,
+                       coordinates, offsets, offsetTrans, facecolors,
+                       antialiased, edgecolors):
+        pass
+
+    def draw_gouraud_triangles(self, gc, triangles_array, colors_array,
+                               transform):
+        pass
 
     def draw_image(self, gc, x, y, im):
         pass
@@ -578,18 +1079,17 @@ class RendererTemplate(RendererBase):
         return 100, 100
 
     def get_text_width_height_descent(self, s, prop, ismath):
-        return 1, 1, 1
+        # Measure text like the Agg backend so the figure is laid out the
+        # same as when it is rendered to an image
+        if self._text_renderer is None:
+            self._text_renderer = RendererAgg(1, 1, self.dpi)
+        return self._text_renderer.get_text_width_height_descent(s, prop, ismath)
 
     def new_gc(self):
         return GraphicsContextTemplate()
 
     def points_to_pixels(self, points):
-        # if backend doesn't have dpi, e.g., postscript or svg
-        return points
-        # elif backend assumes a value for pixels_per_inch
-        #return points/72.0 * self.dpi.get() * pixels_per_inch/72.0
-        # else
-        #return points/72.0 * self.dpi.get()
+        return points/72.0 * self.dpi
 
 
 class GraphicsContextTemplate(GraphicsContextBase):
@@ -640,8 +1140,11 @@ def show(block=None):
     interactive versus batch mode
     """
     for manager in Gcf.get_all_fig_managers():
-        manager.canvas.send_deepforge_update(fig_num=manager.num)
-        pass
+        animations = manager.canvas.get_animations()
+        if animations:
+            manager.canvas.send_animation(animations)
+        else:
+            plotting.emitter.mark_dirty(manager.canvas)
 
 
 def new_figure_manager(num, *args, **kwargs):
@@ -687,27 +1190,103 @@ class FigureCanvasTemplate(FigureCanvasBase):
 
     """
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._last_state = None
+        self._trace_cache = weakref.WeakKeyDictionary()
+        self._timers = weakref.WeakSet()
+        self._sent_animations = weakref.WeakSet()
+
+    def new_timer(self, *args, **kwargs):
+        # Animations are driven by timers from the canvas so they can be
+        # found (and their frames exported) when the figure is shown
+        timer = super().new_timer(*args, **kwargs)
+        self._timers.add(timer)
+        return timer
+
+    def get_animations(self):
+        """Get the animations (such as FuncAnimation) which have not been sent"""
+        animations = []
+        for timer in list(self._timers):
+            for (func, *_) in timer.callbacks:
+                animation = getattr(func, '__self__', None)
+                is_new = isinstance(animation, Animation) and \
+                    animation not in self._sent_animations and \
+                    animation not in animations
+                if is_new:
+                    animations.append(animation)
+        return animations
+
+    def send_animation(self, animations):
+        """Send the frames of the given animations as plotly frames
+
+        The first frame is sent as the figure and the changes of each
+        subsequent frame are appended to its frames, FRAME_BATCH_SIZE frames
+        at a time. The frames are then played by the viewer.
+        """
+        fig_num = self.manager.num
+        interval = getattr(animations[0], '_interval', 200)
+        # Frames are captured as when saving an animation (Animation.save)
+        with plotting.emitter.exclusive(self), plotting.ignore_changes():
+            for animation in animations:
+                animation._init_draw()
+                self._sent_animations.add(animation)
+
+            frame_data = zip(*[anim.new_saved_frame_seq() for anim in animations])
+            last_state = state = None
+            frames = []
+            for (i, data) in enumerate(frame_data):
+                for (animation, datum) in zip(animations, data):
+                    animation._draw_next_frame(datum, blit=False)
+                last_state, state = state, self.figure_to_state()
+                if last_state is None:
+                    layout = dict(state['layout'])
+                    layout['updatemenus'] = get_animation_controls(state, interval)
+                    figure = dict(state, layout=layout, frames=[])
+                    self._last_state = plotting.send_update(
+                        fig_num, figure, self._last_state)
+                else:
+                    frames.append(get_animation_frame(str(i), last_state, state))
+
+                if len(frames) == FRAME_BATCH_SIZE:
+                    self._send_frames(fig_num, frames)
+                    frames = []
+
+            if frames:
+                self._send_frames(fig_num, frames)
+        plotting.clear_changed(self.figure)
+
+    def _send_frames(self, fig_num, frames):
+        figure = dict(self._last_state)
+        figure['frames'] = figure['frames'] + frames
+        self._last_state = plotting.send_update(fig_num, figure, self._last_state)
+
     def draw(self):
         """
-        Draw the figure using the renderer
+        Lay out the figure using the renderer and schedule an update
+
+        The update is exported from this layout if the figure is not changed
+        in the meantime.
         """
-        self.send_deepforge_update(fig_num=plt.gcf().number)
         renderer = RendererTemplate(self.figure.dpi)
-        self.figure.draw(renderer)
+        with plotting.ignore_changes():
+            self.figure.draw(renderer)
+        plotting.emitter.mark_dirty(self)
 
-    def send_deepforge_update(self, fig_num):
-        state = self.figure_to_state()
-        # Probably should do some diff-ing if the state hasn't changed...
-        # TODO
-        print(f'deepforge-cmd PLOT {fig_num} ' + state)
+    def send_deepforge_update(self, fig_num=None):
+        """Send the figure state (or the changes since the last update)
 
-    def figure_to_state(self):
-        figure = self.figure
-        plotly_figure = mpl_to_plotly(
-            figure
-        )
+        Unchanged images (and other values) are not sent again.
+        """
+        if fig_num is None:
+            fig_num = self.manager.num
+        plotting.clear_changed(self.figure)
+        with plotting.ignore_changes():
+            state = self.figure_to_state()
+        self._last_state = plotting.send_update(fig_num, state, self._last_state)
 
-        return plotly_figure.to_json()
+    def figure_to_state(self):
+        return mpl_to_plotly_json(self.figure, self._trace_cache)
 
     # You should provide a print_xxx function for every file format
     # you can write.
@@ -25,6 +25,8 @@ logger.fork = () => logger;
 
 let remainingImageCount = 0;
 let exitCode;
+let partialLine = '';
+let metadataCommands = Promise.resolve();
 class DataRetrievalError extends Error {
     constructor(name, err) {
         const message = `Data retrieval failed for ${name}: ${err}`;
@@ -39,9 +41,12 @@ requirejs([
     Utils,
 ) {
 
-    const {BlobClient, Storage, Constants} = Utils;
+    const {BlobClient, Storage, Constants, MetadataSpool} = Utils;
     const COMMAND_PREFIX = Constants.START_CMD;
     const IMAGE = Constants.IMAGE.PREFIX;
+    const METADATA_FILE = path.resolve('metadata', 'commands.frames');
+    const METADATA_BLOB_PREFIX = Constants.METADATA.BLOB_PREFIX;
+    const MAX_INLINE_METADATA_SIZE = 64 * 1024;
     const url = process.env.DEEPFORGE_HOST || 'http://127.0.0.1:8888';
     const [protocol, , port] = url.split(':');
     const address = url.replace(protocol + '://', '')
@@ -100,12 +105,15 @@ requirejs([
         }
 
         // Run 'python main.py' and merge the stdout, stderr
+        const metadataSpool = await startMetadataSpool();
         const [cmd, args] = await getJobStartCommand(envName);
         job = spawn(cmd, args, {detached: true});
         job.stdout.on('data', onStdout.bind(null, job));
         job.stderr.on('data', onStderr);
         job.on('close', async code => {
             log('script finished w/ exit code:', code);
+            flushStdout(job);
+            await stopMetadataSpool(metadataSpool);
             await deleteCondaEnvironment(envName);
             try {
                 exitCode = code;
@@ -118,6 +126,44 @@ requirejs([
         });
     }
 
+    async function startMetadataSpool() {
+        // Figures are sent by the job on a separate channel (rather than
+        // stdout) and forwarded as complete command lines (in order)
+        await makeIfNeeded(path.dirname(METADATA_FILE));
+        const spool = new MetadataSpool(METADATA_FILE);
+        spool.on(command => {
+            metadataCommands = metadataCommands.then(() => forwardMetadata(command));
+        });
+        await spool.start();
+        process.env.DEEPFORGE_METADATA_FILE = METADATA_FILE;
+        return spool;
+    }
+
+    async function stopMetadataSpool(spool) {
+        try {
+            await spool.stop();
+        } catch (err) {
+            logger.error(`Unable to read metadata: ${err.message}`);
+        }
+        await metadataCommands;
+    }
+
+    async function forwardMetadata(command) {
+        // Large payloads are uploaded to the blob so only a reference is
+        // written to the job output (which is scanned for commands)
+        if (command.length > MAX_INLINE_METADATA_SIZE) {
+            const [cmd, id] = command.split(' ', 2);
+            const content = command.substring(cmd.length + id.length + 2);
+            try {
+                const hash = await blobClient.putFile(`${cmd}-${id}.json`, content);
+                command = `${cmd} ${id} ${METADATA_BLOB_PREFIX}${hash}`;
+            } catch (err) {
+                logger.error(`Unable to upload ${cmd} payload (sending inline): ${err}`);
+            }
+        }
+        process.stdout.write(`${COMMAND_PREFIX} ${command}\n`);
+    }
+
     async function prepareCondaEnvironment(jobDir) {
         if (!await hasConda()) {
             return null;
@@ -394,7 +440,9 @@ requirejs([
     }
 
     function onStdout(job, data) {
-        const lines = data.toString().split('\n');
+        // Only complete lines are checked for commands
+        const lines = (partialLine + data.toString()).split('\n');
+        partialLine = lines.pop();
         const result = [];
 
         // Check for commands...
@@ -403,11 +451,17 @@ requirejs([
             if (cmdStart !== -1 && lines[i].indexOf(IMAGE) !== -1) {
                 uploadImage(job, lines[i]);
             } else {
-                result.push(lines[i]);
+                result.push(lines[i] + '\n');
             }
         }
 
-        process.stdout.write(result.join('\n'));
+        process.stdout.write(result.join(''));
+    }
+
+    function flushStdout(job) {
+        if (partialLine) {
+            onStdout(job, '\n');
+        }
     }
 
     function createCacheDir(cachePath) {
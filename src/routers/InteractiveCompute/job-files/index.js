@@ -29,6 +29,7 @@ class StartSessionFiles extends Files {
         this.addFile('message.js', MESSAGE);
         this.addFile('utils.build.js', Templates.UTILS);
         this.addFile('deepforge/__init__.py', Templates.DEEPFORGE_INIT);
+        this.addFile('deepforge/plotting.py', Templates.DEEPFORGE_PLOTTING);
         const serializeTpl = _.template(Templates.DEEPFORGE_SERIALIZATION);
         this.addFile('deepforge/serialization.py', serializeTpl(CONSTANTS));
     }
@@ -40,6 +40,8 @@ class InteractiveSession {
         this.ws = ws;
         this.sessionID = sessionID;
         this.activeMsgCount = 0;
+        this.subprocess = null;
+        this.pendingInput = null;
     }
 
     async sendMessage(type, data) {
@@ -56,10 +58,29 @@ class InteractiveSession {
         this.activeMsgCount++;
         if (msg.type === Message.RUN) {
             const [cmd, ...opts] = InteractiveSession.parseCommand(msg.data);
-            this.subprocess = spawn(cmd, opts);
-            this.subprocess.on('exit', code => this.onTaskComplete(code));
+            // Input received before the process is spawned is written once it starts
+            this.subprocess = null;
+            this.pendingInput = [];
+            const metadataSpool = await this.startMetadataSpool();
+            const env = Object.assign({}, process.env, {
+                DEEPFORGE_METADATA_FILE: metadataSpool.filepath,
+            });
+            this.subprocess = spawn(cmd, opts, {env});
+            this.pendingInput.forEach(data => this.subprocess.stdin.write(data));
+            this.pendingInput = null;
+            this.subprocess.on('exit', async code => {
+                await this.stopMetadataSpool(metadataSpool);
+                this.onTaskComplete(code);
+            });
             this.subprocess.stdout.on('data', data => this.sendMessage(Message.STDOUT, data));
             this.subprocess.stderr.on('data', data => this.sendMessage(Message.STDERR, data));
+        } else if (msg.type === Message.STDIN) {
+            if (this.pendingInput) {
+                this.pendingInput.push(msg.data);
+            } else if (this.subprocess) {
+                this.subprocess.stdin.write(msg.data);
+            }
+            this.activeMsgCount--;
         } else if (msg.type === Message.KILL) {
             if (this.subprocess) {  // TODO: Add more checking here...
                 this.subprocess.kill();
@@ -112,6 +133,24 @@ class InteractiveSession {
         }
     }
 
+    async startMetadataSpool() {
+        const {MetadataSpool} = await getUtils();
+        const filepath = path.resolve(`metadata-${this.sessionID}.frames`);
+        const spool = new MetadataSpool(filepath);
+        spool.on(command => this.sendMessage(Message.METADATA, command));
+        await spool.start();
+        return spool;
+    }
+
+    async stopMetadataSpool(spool) {
+        try {
+            await spool.stop();
+        } catch (err) {
+            console.log('Unable to read metadata:', err);
+        }
+        await fsp.unlink(spool.filepath).catch(nop);
+    }
+
     ensureValidPath(filepath) {
         const isOutsideWorkspace = path.relative(
             path.resolve(__dirname),
@@ -167,18 +206,20 @@ class InteractiveSession {
 }
 
 async function getStorageAdapters() {
+    const {Storage} = await getUtils();
+    return Storage;
+}
+
+function getUtils() {
     return new Promise((resolve, reject) => {
         requirejs([
             './utils.build',
-        ], (
-            Utils,
-        ) => {
-            const {Storage} = Utils;
-            resolve(Storage);
-        }, reject);
+        ], resolve, reject);
     });
 }
 
+function nop() {}
+
 async function mkdirp() {
     const dirs = Array.prototype.slice.call(arguments);
     await dirs.reduce(async (lastDirPromise, nextDir) => {
@@ -195,13 +236,20 @@ async function mkdirp() {
 }
 
 function initFile(name, type) {
+    // Load the data on first access (memory-mapping arrays when possible)
     const dataPathCode = `path.join(path.dirname(__file__), 'data')`;
     return [
         'import deepforge',
         'from os import path',
         `name = '${name}'`,
         `type = '${type}'`,
-        `data = deepforge.serialization.load('${type}', open(${dataPathCode}, 'rb'))`
+        '',
+        'def __getattr__(attr):',
+        '    if attr == \'data\':',
+        '        global data',
+        `        data = deepforge.serialization.load_mapped(type, ${dataPathCode})`,
+        '        return data',
+        '    raise AttributeError(attr)',
     ].join('\n');
 }
 
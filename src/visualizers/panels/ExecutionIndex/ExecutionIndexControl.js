@@ -4,11 +4,17 @@
 define([
     'js/Constants',
     'deepforge/utils',
-    'deepforge/viz/Execute'
+    'deepforge/viz/Execute',
+    'deepforge/storage/index',
+    'deepforge/viz/StorageHelpers',
+    'plugin/ExecuteJob/ExecuteJob/metadata/PayloadStore',
 ], function (
     CONSTANTS,
     utils,
-    Execute
+    Execute,
+    Storage,
+    StorageHelpers,
+    PayloadStore,
 ) {
 
     'use strict';
@@ -28,6 +34,8 @@ define([
         this.displayedExecutions = [];
         this._graphsForExecution = {};
         this._graphToExec = {};
+        this._figureContents = {};
+        this._storageConfigs = {};
         this._pipelineNames = {};
         this.abbrToId = {};
         this.abbrFor = {};
@@ -77,7 +85,7 @@ define([
     ExecutionIndexControl.prototype._consolidateGraphData = function (graphExecIDs) {
         let graphIds = graphExecIDs.flatMap(execId => this._graphsForExecution[execId]);
         let graphDescs = graphIds.map(id => this._getObjectDescriptor(id))
-            .filter(desc => !!desc);
+            .filter(desc => !!desc && !!desc.plotlyData);
 
         if (graphDescs.length > 1) {
             graphDescs.forEach(graphDesc => {
@@ -209,11 +217,15 @@ define([
         const jobId = graphNode.getParentId();
         const jobNode = this._client.getNode(jobId);
         const execId = jobNode.getParentId();
-        const plotlyData = graphNode.getAttribute('data');
+        const data = graphNode.getAttribute('data');
+        let plotlyData = data ? JSON.parse(data) : null;
+        if (PayloadStore.isReference(plotlyData)) {
+            plotlyData = this.getFigureData(plotlyData);
+        }
         let desc = {
             execId: execId,
             jobName: jobNode.getAttribute('name'),
-            plotlyData: plotlyData ? JSON.parse(plotlyData) : null
+            plotlyData: plotlyData
         };
 
         if (!this._graphToExec[id]) {
@@ -232,6 +244,35 @@ define([
         return desc;
     };
 
+    // Figures stored outside the model are fetched when first displayed
+    ExecutionIndexControl.prototype.getFigureData = function (reference) {
+        const {hash, dataInfo} = reference;
+        const content = this._figureContents[hash];
+        if (typeof content === 'string') {
+            return JSON.parse(content);
+        } else if (!content) {
+            this._figureContents[hash] = this.fetchFigureContent(dataInfo)
+                .then(content => {
+                    this._figureContents[hash] = content;
+                    this._updateGraphWidget();
+                })
+                .catch(err => {
+                    this._logger.error(`Unable to retrieve figure ${hash}: ${err}`);
+                });
+        }
+        return null;
+    };
+
+    ExecutionIndexControl.prototype.fetchFigureContent = async function (dataInfo) {
+        const {backend} = dataInfo;
+        if (!this._storageConfigs[backend]) {  // only ask for credentials once
+            this._storageConfigs[backend] = StorageHelpers.getAuthenticationConfig(dataInfo, true);
+        }
+        const config = await this._storageConfigs[backend];
+        const content = await Storage.getFile(dataInfo, this._logger, {[backend]: config});
+        return typeof content === 'string' ? content : new TextDecoder().decode(content);
+    };
+
     /* * * * * * * * Node Event Handling * * * * * * * */
     ExecutionIndexControl.prototype._eventCallback = function (events) {
         var event;
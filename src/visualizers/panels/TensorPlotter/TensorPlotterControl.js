@@ -2,10 +2,14 @@
 
 define([
     'panels/InteractiveExplorer/InteractiveExplorerControl',
+    'deepforge/compute/interactive/kernel',
     'text!./explorer_helpers.py',
+    'text!./explorer_kernel.py',
 ], function (
     InteractiveExplorerControl,
+    Kernel,
     HELPERS_PY,
+    KERNEL_PY,
 ) {
 
     'use strict';
@@ -16,7 +20,10 @@ define([
             super.initializeWidgetHandlers(widget);
             widget.getPoints = lineInfo => this.getPoints(lineInfo);
             widget.getColorValues = lineInfo => this.getColorValues(lineInfo);
+            widget.getSample = (lineInfo, budget) => this.getSample(lineInfo, budget);
+            widget.getLineValues = (lineInfo, sample) => this.getLineValues(lineInfo, sample);
             widget.getMetadata = desc => this.getMetadata(desc);
+            widget.getStatistics = (name, dataSlice) => this.getStatistics(name, dataSlice);
         }
 
         async onComputeInitialized (session) {
@@ -25,72 +32,109 @@ define([
             const initCode = await this.getInitializationCode();
             await session.addFile('utils/init.py', initCode);
             await session.addFile('utils/explorer_helpers.py', HELPERS_PY);
+            await session.addFile('utils/explorer_kernel.py', KERNEL_PY);
+            this.kernel = new Kernel(session.fork(), 'python -m utils.explorer_kernel');
         }
 
-        async getPoints (lineInfo) {
-            const {data, dataSlice=''} = lineInfo;
-            const {pyImport, varName} = this.getImportCode(data);
-            const command = [
-                'import utils.init',
-                pyImport,
-                'from utils.explorer_helpers import print_points',
-                `print_points(${varName}${dataSlice})`
-            ].join('\n');
-            const stdout = await this.execPy(command);
-            return JSON.parse(stdout);
-        }
-
-        async getColorValues (lineInfo) {
-            const {colorData, colorDataSlice='', startColor, endColor} = lineInfo;
-            const {pyImport, varName} = this.getImportCode(colorData);
-            const command = [
-                'import utils.init',
-                pyImport,
-                'from utils.explorer_helpers import print_colors',
-                `data = ${varName}${colorDataSlice}`,
-                `print_colors(data, "${startColor}", "${endColor}")`
-            ].join('\n');
-            const stdout = await this.execPy(command);
-            return JSON.parse(stdout);
+        async getPoints (lineInfo, sample) {
+            const [points] = await this.query([this.getPointsRequest(lineInfo, sample)]);
+            return points;
+        }
+
+        async getColorValues (lineInfo, sample) {
+            const [colors] = await this.query([this.getColorsRequest(lineInfo, sample)]);
+            return colors;
+        }
+
+        async getLineValues (lineInfo, sample) {
+            const requests = [this.getPointsRequest(lineInfo, sample)];
+            if (lineInfo.colorType !== 'uniform') {
+                requests.push(this.getColorsRequest(lineInfo, sample));
+            }
+            const [points, colors] = await this.query(requests);
+            return {points, colors};
+        }
+
+        async getSample (lineInfo, budget) {
+            const {data, dataSlice='', sampleMethod='stride'} = lineInfo;
+            const params = this.getDataParams(data, dataSlice);
+            params.budget = budget;
+            params.method = sampleMethod;
+            if (sampleMethod === 'stratified') {
+                const {colorType, colorData, colorDataSlice=''} = lineInfo;
+                if (colorType === 'uniform') {
+                    params.method = 'random';
+                } else {
+                    params.strata = this.getDataParams(colorData, colorDataSlice);
+                }
+            }
+            const [sample] = await this.query([{method: 'sample', params}]);
+            return sample;
         }
 
         async getMetadata (desc) {
             const {name} = desc;
-            const {pyImport, varName} = this.getImportCode(name);
-            const command = [
-                'import utils.init',
-                pyImport,
-                'from utils.explorer_helpers import print_metadata',
-                `print_metadata("${varName}", ${varName})`,
-            ].join('\n');
-            const stdout = await this.execPy(command);
-            return JSON.parse(stdout);
-        }
-
-        getImportCode (artifactName) {
+            const [metadata] = await this.query([{
+                method: 'metadata',
+                params: this.getDataParams(name),
+            }]);
+            return metadata;
+        }
+
+        async getStatistics (artifactName, dataSlice) {
+            const [statistics] = await this.query([{
+                method: 'statistics',
+                params: this.getDataParams(artifactName, dataSlice),
+            }]);
+            return statistics;
+        }
+
+        getPointsRequest (lineInfo, sample) {
+            const {data, dataSlice=''} = lineInfo;
+            const params = this.getDataParams(data, dataSlice);
+            params.sample = sample;
+            params.projection = this.getProjection(lineInfo);
+            return {method: 'points', params};
+        }
+
+        getProjection (lineInfo) {
+            const {projection, projectionDimensions=3} = lineInfo;
+            if (projection) {
+                return {method: projection, dimensions: +projectionDimensions};
+            }
+            return null;
+        }
+
+        getColorsRequest (lineInfo, sample) {
+            const {colorData, colorDataSlice='', startColor, endColor} = lineInfo;
+            const {colormap=null, colorRange} = lineInfo;
+            const params = this.getDataParams(colorData, colorDataSlice);
+            params.start_color = startColor;
+            params.end_color = endColor;
+            params.colormap = colormap;
+            params.percentiles = colorRange ? colorRange.split(',').map(Number) : null;
+            params.sample = sample;
+            return {method: 'colors', params};
+        }
+
+        getDataParams (artifactName, dataSlice='') {
             const pyName = artifactName.replace(/\..*$/, '');
             const [modName, ...accessors] = pyName.split('[');
-            const pyImport = `from artifacts.${modName} import data as ${modName}`;
             const accessor = accessors.length ? '[' + accessors.join('[') : '';
-            const varName = modName + accessor;
             return {
-                pyImport, varName
+                artifact: modName,
+                expression: modName + accessor + dataSlice,
             };
         }
 
-        async execPy(code) {
+        async query (requests) {
             try {
-                const i = ++this.cmdCount;
-                await this.session.addFile(`cmd_${i}.py`, code);
-                const {stdout} = await this.session.exec(`python cmd_${i}.py`);
-                await this.session.removeFile(`cmd_${i}.py`);
-                return stdout;
+                return await this.kernel.batch(requests);
             } catch (err) {
-                const {stderr} = err.jobResult;
-                const wrappedError = new Error(err.message);
-                wrappedError.stderr = stderr;
-                wrappedError.code = code;
-                throw wrappedError;
+                err.code = requests
+                    .map(request => `${request.method}: ${request.params.expression}`)
+                    .join('\n');
+                throw err;
             }
         }
 
@@ -117,6 +161,13 @@ define([
 
             return territory;
         }
+
+        destroy () {
+            if (this.kernel) {
+                this.kernel.close();
+            }
+            super.destroy();
+        }
     }
 
     return TensorPlotterControl;
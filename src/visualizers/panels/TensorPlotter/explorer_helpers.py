@@ -1,4 +1,15 @@
+import base64
 import json
+import numpy as np
+
+COLOR_TABLE_SIZE = 256
+MAX_STRATA = 256
+HISTOGRAM_BINS = 20
+STATISTICS_CHUNK_SIZE = 2 ** 20  # entries
+MAX_COLUMN_STATISTICS = 32
+PCA_OVERSAMPLES = 10
+PCA_POWER_ITERATIONS = 2
+NEIGHBOR_EMBEDDING_DIMENSIONS = 50
 
 def metadata(name, data):
     info = {}
@@ -7,9 +18,151 @@ def metadata(name, data):
         info['entries'] = [metadata(k, v) for (k, v) in data.items()]
     else:
         info['shape'] = data.shape
+        info['dtype'] = str(getattr(data, 'dtype', type(data).__name__))
 
     return info
 
+def statistics(data, bins=HISTOGRAM_BINS, chunk_size=STATISTICS_CHUNK_SIZE):
+    """Compute summary statistics for the (numeric) array in chunks of rows.
+
+    The statistics contain the count, nan_count, inf_count, min, max, mean, std
+    and a histogram ({counts, edges}) of the finite values. If the array has
+    multiple (up to MAX_COLUMN_STATISTICS) columns, the statistics of each are
+    included as "columns". Only one chunk of the array is loaded at a time so
+    memory-mapped arrays are never loaded entirely.
+    """
+    get_chunks = chunk_reader(data, chunk_size)
+    first_chunk = next(get_chunks(), None)
+    if first_chunk is None or first_chunk.dtype.kind not in 'biuf':
+        return None
+
+    columns = RunningStatistics(first_chunk.shape[1])
+    for chunk in get_chunks():
+        columns.update(chunk)
+    total = columns.merge()
+
+    include_columns = 1 < columns.width <= MAX_COLUMN_STATISTICS
+    histograms = [total.histogram(bins)]
+    if include_columns:
+        histograms.extend(columns.column(i).histogram(bins) for i in range(columns.width))
+
+    for chunk in get_chunks():
+        chunk = chunk.astype(np.float64)
+        histograms[0].update(chunk)
+        if include_columns:
+            for (i, histogram) in enumerate(histograms[1:]):
+                histogram.update(chunk[:, i])
+
+    summary = total.summary(histograms[0])
+    if include_columns:
+        summary['columns'] = [
+            columns.column(i).summary(histogram)
+            for (i, histogram) in enumerate(histograms[1:])
+        ]
+    return summary
+
+def chunk_reader(data, chunk_size):
+    shape = tuple(data.shape)
+    if not shape:
+        return lambda: iter([np.reshape(np.asarray(data), (1, 1))])
+
+    rows = shape[0]
+    width = int(np.prod(shape[1:]))
+    chunk_rows = max(1, chunk_size // max(width, 1))
+
+    def get_chunks():
+        for start in range(0, rows, chunk_rows):
+            chunk = np.asarray(data[start:start + chunk_rows])
+            yield chunk.reshape(chunk.shape[0], width)
+
+    return get_chunks
+
+class RunningStatistics:
+    """Statistics of each column, updated with chunks of rows (using the
+    parallel algorithm of Chan et al. for the variance)."""
+    def __init__(self, width):
+        self.width = width
+        self.count = np.zeros(width, dtype=np.int64)
+        self.nan_count = np.zeros(width, dtype=np.int64)
+        self.inf_count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+
+    def update(self, chunk):
+        chunk = chunk.astype(np.float64)
+        finite = np.isfinite(chunk)
+        nans = np.isnan(chunk).sum(axis=0)
+        self.nan_count += nans
+        self.inf_count += chunk.shape[0] - nans - finite.sum(axis=0)
+
+        count = finite.sum(axis=0)
+        mean = np.where(finite, chunk, 0).sum(axis=0) / np.maximum(count, 1)
+        m2 = (np.where(finite, chunk - mean, 0) ** 2).sum(axis=0)
+        self.combine(count, mean, m2)
+        self.min = np.fmin(self.min, np.where(finite, chunk, np.inf).min(axis=0))
+        self.max = np.fmax(self.max, np.where(finite, chunk, -np.inf).max(axis=0))
+
+    def combine(self, count, mean, m2):
+        total = self.count + count
+        scale = np.maximum(total, 1)
+        delta = mean - self.mean
+        self.mean = self.mean + delta * count / scale
+        self.m2 = self.m2 + m2 + delta ** 2 * self.count * count / scale
+        self.count = total
+
+    def merge(self):
+        merged = RunningStatistics(1)
+        for i in range(self.width):
+            merged.combine(self.count[i:i+1], self.mean[i:i+1], self.m2[i:i+1])
+        merged.nan_count[0] = self.nan_count.sum()
+        merged.inf_count[0] = self.inf_count.sum()
+        merged.min[0] = self.min.min()
+        merged.max[0] = self.max.max()
+        return merged
+
+    def column(self, index):
+        column = RunningStatistics(1)
+        for name in ('count', 'nan_count', 'inf_count', 'mean', 'm2', 'min', 'max'):
+            getattr(column, name)[0] = getattr(self, name)[index]
+        return column
+
+    def histogram(self, bins):
+        value_range = (self.min[0], self.max[0]) if self.count[0] else (0, 1)
+        return Histogram(bins, value_range)
+
+    def summary(self, histogram):
+        count = int(self.count[0])
+        summary = {
+            'count': count,
+            'nan_count': int(self.nan_count[0]),
+            'inf_count': int(self.inf_count[0]),
+            'min': None,
+            'max': None,
+            'mean': None,
+            'std': None,
+            'histogram': histogram.summary(),
+        }
+        if count:
+            summary['min'] = float(self.min[0])
+            summary['max'] = float(self.max[0])
+            summary['mean'] = float(self.mean[0])
+            summary['std'] = float(np.sqrt(self.m2[0] / count))
+        return summary
+
+class Histogram:
+    def __init__(self, bins, value_range):
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.edges = np.histogram_bin_edges([], bins, value_range)
+
+    def update(self, values):
+        values = values[np.isfinite(values)]
+        self.counts += np.histogram(values, self.edges)[0]
+
+    def summary(self):
+        return {'counts': self.counts.tolist(), 'edges': self.edges.tolist()}
+
 def tolist(array):
     depth = len(array.shape)
     if depth == 1:
@@ -17,32 +170,204 @@ def tolist(array):
     else:
         return [tolist(i) for i in array]
 
-def scale_colors(array, start_color, end_color):
-    array = set_range_0_to_1(array)
-    red = project_to_range(array, int(start_color[0:2], 16), int(end_color[0:2], 16))
-    green = project_to_range(array, int(start_color[2:4], 16), int(end_color[2:4], 16))
-    blue = project_to_range(array, int(start_color[4:6], 16), int(end_color[4:6], 16))
-    return [ color_string(r, g, b) for (r, g, b) in zip(red, green, blue) ]
+def encode_array(array, dtype='<f4'):
+    """Encode an array as base64 bytes with the dtype and shape (see BinaryArrays.js)."""
+    array = np.ascontiguousarray(array, dtype=dtype)
+    return {
+        'dtype': array.dtype.str[1:],
+        'shape': list(array.shape),
+        'bdata': base64.b64encode(array.tobytes()).decode('ascii'),
+    }
+
+def scale_colors(array, start_color, end_color, colormap=None, percentiles=None, indices=None):
+    """Map values to packed uint8 RGB colors (shape: (N, 3)).
+
+    Values are normalized to the range given by the percentiles (min to max by
+    default) and looked up in a 256 color table built from either the named
+    matplotlib colormap or a linear ramp between the two hex colors. If indices
+    are given, only the colors of the given entries are returned (normalized
+    using the range of the entire array).
+    """
+    values = np.asarray(array, dtype=np.float32).reshape(-1)
+    low, high = value_range(values, percentiles)
+    if indices is not None:
+        values = values[indices]
+    values = normalize(values, low, high)
+
+    lookup = np.linspace(0, 1, COLOR_TABLE_SIZE)
+    if colormap:
+        table = get_colormap(colormap)(lookup, bytes=True)[:, :3]
+    else:
+        start = hex_to_rgb(start_color)
+        end = hex_to_rgb(end_color)
+        table = np.rint(start + lookup[:, np.newaxis] * (end - start)).astype(np.uint8)
+
+    indices = (values * (COLOR_TABLE_SIZE - 1) + 0.5).astype(np.intp)
+    return table[indices]
+
+def value_range(values, percentiles=None):
+    finite = values[np.isfinite(values)]
+    if finite.size == 0:
+        return (0, 0)
+    if percentiles:
+        return tuple(np.percentile(finite, percentiles))
+    return (finite.min(), finite.max())
+
+def normalize(values, low, high):
+    span = high - low
+    if not span > 0:
+        return np.zeros_like(values)
+    values = np.clip((values - low) / span, 0, 1)
+    return np.nan_to_num(values, copy=False)
+
+def hex_to_rgb(color):
+    return np.array([int(color[i:i+2], 16) for i in (0, 2, 4)], dtype=np.float64)
+
+def get_colormap(name):
+    try:
+        from matplotlib import colormaps
+        return colormaps[name]
+    except ImportError:
+        from matplotlib.cm import get_cmap
+        return get_cmap(name)
+
+def sample_indices(size, budget=None, method='stride', strata=None, seed=0):
+    """Select up to `budget` of `size` entries using the given sampling method.
+
+    Supported methods are 'stride' (evenly spaced), 'random' and 'stratified'
+    (random within each stratum, keeping at least one entry from each stratum
+    while the budget allows). The indices are ordered so any prefix is a
+    coarse sample of the entire selection; this allows the points to be sent
+    progressively.
+    """
+    budget = size if budget is None else min(budget, size)
+    rng = np.random.default_rng(seed)
+    if method == 'random':
+        return rng.choice(size, budget, replace=False)
+    elif method == 'stratified':
+        return stratified_sample(get_strata(strata, size), budget, rng)
+    elif method == 'stride':
+        indices = np.linspace(0, size - 1, num=budget).astype(np.intp)
+        return indices[progressive_order(budget)]
+
+    raise ValueError('Unknown sampling method: ' + method)
+
+def progressive_order(count):
+    """Order positions coarse to fine: 0, n/2, n/4, 3n/4, n/8, ..."""
+    positions = np.arange(count)
+    levels = positions & -positions
+    if count:
+        levels[0] = count
+    return np.argsort(-levels, kind='stable')
+
+def get_strata(values, size, max_strata=MAX_STRATA):
+    """Label each entry with its stratum: the distinct value (for integers, strings,
+    etc) or the percentile bin (for floats)."""
+    values = np.asarray(values).reshape(-1)
+    if values.size != size:
+        raise ValueError(f'Expected {size} values to stratify by (found {values.size})')
+
+    if values.dtype.kind == 'f':
+        finite = values[np.isfinite(values)]
+        if finite.size == 0:
+            return np.zeros(size, dtype=np.intp)
+        bin_edges = np.percentile(finite, np.linspace(0, 100, max_strata + 1)[1:-1])
+        return np.digitize(values, bin_edges)
+
+    return np.unique(values, return_inverse=True)[1].reshape(-1)
+
+def stratified_sample(strata, budget, rng):
+    order = np.argsort(strata, kind='stable')
+    counts = np.bincount(strata)
+    counts = counts[counts > 0]
+    quotas = np.minimum(counts, np.maximum(budget * counts // strata.size, 1))
+    quotas = cap_quotas(quotas, budget, rng)
+    groups = np.split(order, np.cumsum(counts)[:-1])
+    indices = np.concatenate([
+        rng.choice(group, quota, replace=False)
+        for (group, quota) in zip(groups, quotas)
+    ])
+    rng.shuffle(indices)
+    return indices
+
+def cap_quotas(quotas, budget, rng):
+    """Trim the largest quotas so they sum to at most the budget."""
+    if quotas.sum() <= budget:
+        return quotas
+
+    (low, high) = (0, int(quotas.max()))
+    while low < high:
+        cap = (low + high + 1) // 2
+        if np.minimum(quotas, cap).sum() <= budget:
+            low = cap
+        else:
+            high = cap - 1
+
+    capped = np.minimum(quotas, low)
+    remaining = budget - capped.sum()
+    larger = np.flatnonzero(quotas > low)
+    capped[rng.choice(larger, remaining, replace=False)] += 1
+    return capped
+
+def project(array, method='pca', dimensions=3, seed=0):
+    """Project the rows of the array to the given number of dimensions.
+
+    Supported methods are 'pca' (randomized PCA), 'random' (Gaussian random
+    projection) and, if umap-learn or scikit-learn are installed, 'umap' and
+    'tsne'. The result is a float32 array of shape (N, dimensions).
+    """
+    values = np.asarray(array)
+    values = values.reshape(values.shape[0], -1)
+    if values.dtype != np.float64:
+        values = values.astype(np.float32, copy=False)
+
+    rng = np.random.default_rng(seed)
+    if method == 'pca':
+        projected = pca(values, dimensions, rng)
+    elif method == 'random':
+        matrix = rng.standard_normal((values.shape[1], dimensions), dtype=np.float32)
+        projected = values @ (matrix / np.sqrt(dimensions))
+    elif method == 'umap':
+        import umap
+        reducer = umap.UMAP(n_components=dimensions, random_state=seed)
+        projected = reducer.fit_transform(reduce_for_neighbor_embedding(values, rng))
+    elif method == 'tsne':
+        from sklearn.manifold import TSNE
+        reducer = TSNE(n_components=dimensions, init='pca', random_state=seed)
+        projected = reducer.fit_transform(reduce_for_neighbor_embedding(values, rng))
+    else:
+        raise ValueError('Unknown projection method: ' + method)
+
+    return np.asarray(projected, dtype=np.float32)
+
+def pca(values, dimensions, rng):
+    """Randomized PCA (Halko et al.) without creating a centered copy of the values."""
+    mean = values.mean(axis=0)
+    dimensions = min(dimensions, *values.shape)
+    rank = min(dimensions + PCA_OVERSAMPLES, *values.shape)
+    centered_dot = lambda matrix: values @ matrix - mean @ matrix
+    centered_tdot = lambda matrix: matrix.T @ values - np.outer(matrix.sum(axis=0), mean)
 
-def color_string(r, g, b):
-    colors = [ hex(int(num))[2:].rjust(2, '0') for num in (r,g,b) ]
-    return '#' + ''.join(colors)
+    basis = rng.standard_normal((values.shape[1], rank)).astype(values.dtype)
+    basis, _ = np.linalg.qr(centered_dot(basis))
+    for _ in range(PCA_POWER_ITERATIONS):
+        basis, _ = np.linalg.qr(centered_tdot(basis).T)
+        basis, _ = np.linalg.qr(centered_dot(basis))
 
-def project_to_range(array, start, end):
-    size = end - start
-    return (array * size) + start
+    _, _, components = np.linalg.svd(centered_tdot(basis), full_matrices=False)
+    return centered_dot(components[:dimensions].T)
 
-def set_range_0_to_1(array):
-    array = array - array.min()
-    array = array / array.max()
-    return array
+def reduce_for_neighbor_embedding(values, rng):
+    if values.shape[1] <= NEIGHBOR_EMBEDDING_DIMENSIONS:
+        return values
+    return pca(values, NEIGHBOR_EMBEDDING_DIMENSIONS, rng)
 
 def print_points(data):
-    print(json.dumps(tolist(data)))
+    print(json.dumps(encode_array(data)))
 
-def print_colors(data, start_color, end_color):
-    colors = scale_colors(data, start_color, end_color)
-    print(json.dumps(colors))
+def print_colors(data, start_color, end_color, colormap=None, percentiles=None):
+    colors = scale_colors(data, start_color, end_color, colormap, percentiles)
+    print(json.dumps(encode_array(colors, dtype='u1')))
 
 def print_metadata(name, data):
     print(json.dumps(metadata(name, data)))
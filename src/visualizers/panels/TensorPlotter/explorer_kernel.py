@@ -0,0 +1,160 @@
+"""
+A long-running worker which answers the queries of the tensor plotter.
+
+Artifacts (and the modules used to load them) stay in memory between queries
+so a request only needs to evaluate the requested data. Requests are read from
+stdin as JSON lines containing a list of requests:
+
+    [{"id": 1, "method": "points", "params": {...}}, ...]
+
+The responses to each line are written to stdout as a single JSON line:
+
+    [{"id": 1, "result": ...}, {"id": 2, "error": {"message": ..., "traceback": ...}}]
+
+Anything printed while answering a request is redirected to stderr.
+"""
+import contextlib
+import importlib
+import json
+import os
+import sys
+import traceback
+from collections import OrderedDict
+
+import numpy as np
+
+import utils.init
+from utils import explorer_helpers as helpers
+
+MAX_SAMPLES = 32
+MAX_PROJECTIONS = 8
+
+class Kernel:
+    def __init__(self, output):
+        self.output = output
+        self.artifacts = {}
+        self.samples = OrderedDict()
+        self.statistics_cache = {}
+        self.projections = OrderedDict()
+        self.next_sample_id = 1
+        self.methods = {
+            'metadata': self.metadata,
+            'sample': self.sample,
+            'statistics': self.statistics,
+            'points': self.points,
+            'colors': self.colors,
+        }
+
+    def get_artifact(self, name):
+        version = self.get_artifact_version(name)
+        cached = self.artifacts.get(name)
+        if cached is None or cached[0] != version:
+            module_name = 'artifacts.' + name
+            if module_name in sys.modules:
+                module = sys.modules[module_name]
+                vars(module).pop('data', None)
+                module = importlib.reload(module)
+            else:
+                importlib.invalidate_caches()
+                module = importlib.import_module(module_name)
+            cached = (version, module.data)
+            self.artifacts[name] = cached
+
+        return cached[1]
+
+    def get_artifact_version(self, name):
+        stats = os.stat(os.path.join('artifacts', name, 'data'))
+        return (stats.st_mtime, stats.st_size)
+
+    def evaluate(self, artifact, expression):
+        return eval(expression, {artifact: self.get_artifact(artifact)})
+
+    def metadata(self, artifact, expression):
+        return helpers.metadata(expression, self.evaluate(artifact, expression))
+
+    def get_data(self, artifact, expression, projection=None):
+        data = self.evaluate(artifact, expression)
+        if not projection:
+            return data
+
+        version = self.artifacts[artifact][0]
+        key = (artifact, expression, json.dumps(projection, sort_keys=True))
+        cached = self.projections.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, helpers.project(data, **projection))
+            self.projections[key] = cached
+            if len(self.projections) > MAX_PROJECTIONS:
+                self.projections.popitem(last=False)
+        return cached[1]
+
+    def statistics(self, artifact, expression):
+        data = self.evaluate(artifact, expression)
+        version = self.artifacts[artifact][0]
+        key = (artifact, expression)
+        cached = self.statistics_cache.get(key)
+        if cached is None or cached[0] != version:
+            cached = (version, helpers.statistics(data))
+            self.statistics_cache[key] = cached
+        return cached[1]
+
+    def sample(self, artifact, expression, budget=None, method='stride', strata=None):
+        size = len(self.evaluate(artifact, expression))
+        if strata:
+            strata = self.evaluate(**strata)
+        indices = helpers.sample_indices(size, budget, method, strata)
+
+        sample_id = self.next_sample_id
+        self.next_sample_id += 1
+        self.samples[sample_id] = indices
+        if len(self.samples) > MAX_SAMPLES:
+            self.samples.popitem(last=False)
+
+        return {'id': sample_id, 'size': len(indices), 'total': size}
+
+    def get_sample_indices(self, sample):
+        if sample['id'] not in self.samples:
+            raise ValueError('Sample not found: ' + str(sample['id']))
+        indices = self.samples[sample['id']]
+        return indices[sample.get('start', 0):sample.get('stop')]
+
+    def points(self, artifact, expression, sample=None, projection=None):
+        data = self.get_data(artifact, expression, projection)
+        if sample:
+            data = np.asarray(data)[self.get_sample_indices(sample)]
+        return helpers.encode_array(data)
+
+    def colors(self, artifact, expression, start_color, end_color, colormap=None,
+            percentiles=None, sample=None):
+        data = self.evaluate(artifact, expression)
+        indices = self.get_sample_indices(sample) if sample else None
+        colors = helpers.scale_colors(data, start_color, end_color, colormap,
+                percentiles, indices)
+        return helpers.encode_array(colors, dtype='u1')
+
+    def handle(self, request):
+        response = {'id': request.get('id')}
+        try:
+            name = request['method']
+            if name not in self.methods:
+                raise ValueError('Unknown method: ' + name)
+            method = self.methods[name]
+            response['result'] = method(**request.get('params', {}))
+        except Exception as e:
+            response['error'] = {
+                'message': str(e),
+                'traceback': traceback.format_exc(),
+            }
+        return response
+
+    def serve(self, requests):
+        for line in iter(requests.readline, ''):
+            if not line.strip():
+                continue
+            batch = json.loads(line)
+            with contextlib.redirect_stdout(sys.stderr):
+                responses = [self.handle(request) for request in batch]
+            self.output.write(json.dumps(responses) + '\n')
+            self.output.flush()
+
+if __name__ == '__main__':
+    Kernel(sys.stdout).serve(sys.stdin)
@@ -6,6 +6,8 @@ define([
     'deepforge/PromiseEvents',
     'deepforge/compute/interactive/message',
     'deepforge/CodeGenerator',
+    'deepforge/viz/PlotPatch',
+    'deepforge/viz/BinaryArrays',
     'plugin/GenerateJob/GenerateJob/templates/index',
     'text!./Main.py',
     'text!./TrainOperation.py',
@@ -21,6 +23,8 @@ define([
     PromiseEvents,
     Message,
     CodeGenerator,
+    PlotPatch,
+    BinaryArrays,
     JobTemplates,
     MainCode,
     TrainOperation,
@@ -106,19 +110,23 @@ define([
                 await self.initTrainingCode(modelInfo);
                 this.emit('update', 'Training...');
                 const trainTask = self.session.spawn('python start_train.py');
+                const figures = {};
                 self.currentTrainTask = trainTask;
-                self.currentTrainTask.on(Message.STDOUT, data => {
-                    let line = data.toString();
-                    if (line.startsWith(CONSTANTS.START_CMD)) {
-                        line = line.substring(CONSTANTS.START_CMD.length + 1);
-                        const splitIndex = line.indexOf(' ');
-                        const cmd = line.substring(0, splitIndex);
-                        const content = JSON.parse(line.substring(splitIndex + 1));
-                        if (cmd === 'PLOT') {
-                            this.emit('plot', content);
-                        } else {
-                            console.error('Unrecognized command:', cmd);
-                        }
+                self.currentTrainTask.on(Message.METADATA, command => {
+                    const [cmd, figureId] = command.split(' ', 2);
+                    const contentIndex = cmd.length + figureId.length + 2;
+                    const content = BinaryArrays.decodeAll(
+                        JSON.parse(command.substring(contentIndex)),
+                        true
+                    );
+                    if (cmd === 'PLOT') {
+                        figures[figureId] = content;
+                        this.emit('plot', content);
+                    } else if (cmd === 'PLOT_PATCH' && figures[figureId]) {
+                        figures[figureId] = PlotPatch.apply(figures[figureId], content);
+                        this.emit('plot', figures[figureId]);
+                    } else {
+                        console.error('Unrecognized command:', cmd);
                     }
                 });
                 let stderr = '';
@@ -28,7 +28,7 @@ define([
         }
 
         async onAddDataClicked() {
-            const editor = new PlottedDataEditor(null, this.metadata);
+            const editor = new PlottedDataEditor(null, this.metadata, this.getStatistics);
             const data = await editor.show();
             if (data) {
                 this.plottedData.push(data);
@@ -71,7 +71,7 @@ define([
         }
 
         async editPlottedData(data) {
-            const editor = new PlottedDataEditor(data, this.metadata);
+            const editor = new PlottedDataEditor(data, this.metadata, this.getStatistics);
             const newData = await editor.show();
             const index = this.plottedData.findIndex(d => d.id === newData.id);
             if (index > -1) {
@@ -15,14 +15,15 @@ define([
     const {InvalidSliceError} = PythonSliceParser;
     Html = _.template(Html);
     class PlottedDataEditor extends DataEditorBase {
-        constructor(plottedData, dataShapes) {
+        constructor(plottedData, dataShapes, getStatistics) {
             const isNewData = !plottedData;
             const title = isNewData ? `Add data to figure` :
                 `Edit "${plottedData.name}"`;
 
-            const fields = ['id', 'name', 'data', 'dataSlice', 'colorData',
-                'colorDataSlice', 'colorType', 'uniformColor', 'startColor',
-                'endColor'];
+            const fields = ['id', 'name', 'data', 'dataSlice', 'projection',
+                'projectionDimensions', 'sampleMethod', 'maxPoints', 'colorData',
+                'colorDataSlice', 'colorType',
+                'uniformColor', 'startColor', 'endColor', 'colormap', 'colorRange'];
             super(Html({title}), fields);
             this.setDataOptions(dataShapes);
 
@@ -39,6 +40,7 @@ define([
             const onDataChange = _.debounce(() => this.validateAllPythonData(true), 250);
 
             this.dataShapes = dataShapes;
+            this.getStatistics = getStatistics;
             this.$el.find('#dataSlice').on('input', onDataUpdate);
             this.$el.find('#colorDataSlice').on('input', onDataUpdate);
             this.$el.find('#data').on('change', onDataChange);
@@ -112,6 +114,9 @@ define([
             data.id = this.id;
             if (!shallow) {
                 data.shape = this.getPythonDataShape(data.data, data.dataSlice);
+                if (data.projection) {
+                    data.shape = [data.shape[0], +data.projectionDimensions];
+                }
             }
             return data;
         }
@@ -133,6 +138,7 @@ define([
                 const displayShape = `(${shape.join(', ')})`;
                 $shape.innerText = displayShape;
                 this.$elements[sliceName].parent().removeClass('has-error');
+                this.showStatistics($shape, data[dataName], data[sliceName]);
                 return true;
             } catch (err) {
                 const isSyntaxError = err instanceof InvalidSliceError;
@@ -145,6 +151,45 @@ define([
             }
         }
 
+        async showStatistics($shape, dataName, dataSlice='') {
+            const $stats = $($shape).siblings('.data-statistics');
+            if (!this.getStatistics || !dataName) {
+                return;
+            }
+
+            const key = dataName + dataSlice;
+            if ($stats.attr('data-key') === key) {
+                return;
+            }
+            $stats.attr('data-key', key);
+            $stats.text('');
+            try {
+                const stats = await this.getStatistics(dataName, dataSlice);
+                if ($stats.attr('data-key') === key) {
+                    $stats.text(PlottedDataEditor.getStatisticsSummary(stats));
+                }
+            } catch (err) {
+                $stats.removeAttr('data-key');
+            }
+        }
+
+        static getStatisticsSummary(stats) {
+            if (!stats || !stats.count) {
+                return '';
+            }
+
+            const format = value => +value.toPrecision(4);
+            const invalidCount = stats.nan_count + stats.inf_count;
+            const summary = [
+                `range: [${format(stats.min)}, ${format(stats.max)}]`,
+                `mean: ${format(stats.mean)} \u00b1 ${format(stats.std)}`,
+            ];
+            if (invalidCount) {
+                summary.push(`${invalidCount} NaN/inf`);
+            }
+            return summary.join(', ');
+        }
+
         validateName() {
             const name = this.$elements.name.val();
             const isValid = !!name.trim();
@@ -8,6 +8,7 @@ define([
     './ArtifactLoader',
     'underscore',
     'deepforge/viz/InformDialog',
+    'deepforge/viz/BinaryArrays',
     'css!./styles/TensorPlotterWidget.css',
 ], function (
     InteractiveExplorerWidget,
@@ -17,10 +18,14 @@ define([
     ArtifactLoader,
     _,
     InformDialog,
+    BinaryArrays,
 ) {
     'use strict';
 
     const WIDGET_CLASS = 'tensor-plotter';
+    const POINT_BUDGET = 200000;
+    const INITIAL_SAMPLE_SIZE = 10000;
+    const SAMPLE_CHUNK_SIZE = 50000;
 
     class TensorPlotterWidget extends InteractiveExplorerWidget {
         constructor(logger, container) {
@@ -28,6 +33,7 @@ define([
             this._logger = logger.fork('Widget');
             this.cmdCount = 0;
             this.currentPlotData = null;
+            this.plotVersion = 0;
 
             this.$el = container;
             this.$el.addClass(WIDGET_CLASS);
@@ -39,6 +45,8 @@ define([
             const rightPanel = $('<div>', {class: 'col-3'});
             const $plotEditor = $('<div>', {class: 'plot-editor'});
             this.plotEditor = new PlotEditor($plotEditor);
+            this.plotEditor.getStatistics = (name, dataSlice) =>
+                this.getStatistics(name, dataSlice);
             this.plotEditor.on('update', plotData => {
                 this.updatePlot(plotData);
             });
@@ -75,16 +83,18 @@ define([
             }
         }
 
-        async getPlotData (line) {
+        async getPlotData (line, sample) {
             const {shape} = line;
             const dim = shape[1];
             const dataDims = dim ? dim : 1;
+            const {points, colors} = await this.getLineValues(line, sample);
+            const columns = BinaryArrays.decodeColumns(points);
             let x,y,z;
             let plotData = null;
             switch(dataDims) {
             case 1:
                 plotData = {
-                    y: await this.getPoints(line),
+                    y: columns[0],
                     boxpoints: 'all',
                     jitter: 0.3,
                     pointpos: -1.8,
@@ -94,7 +104,7 @@ define([
                 break;
 
             case 2:
-                [x, y] = _.unzip(await this.getPoints(line));
+                [x, y] = columns;
                 plotData = {
                     name: line.name,
                     mode: 'markers',  // lines
@@ -104,7 +114,7 @@ define([
                 break;
 
             case 3:
-                [x, y, z] = _.unzip(await this.getPoints(line));
+                [x, y, z] = columns;
                 plotData = {
                     name: line.name,
                     mode: 'markers',  // lines
@@ -113,26 +123,34 @@ define([
                 };
                 break;
             }
-            await this.addPlotColor(plotData, line);
+            this.addPlotColor(plotData, line, colors);
             return plotData;
         }
 
-        async addPlotColor (plotData, line) {
+        addPlotColor (plotData, line, colors) {
             if (line.colorType === 'uniform') {
                 plotData.marker = {
                     color: `#${line.uniformColor}`,
                     size: 2,
                 };
             } else {
-                const colors = await this.getColorValues(line);
                 plotData.marker = {
-                    color: colors,
+                    color: TensorPlotterWidget.getColorStrings(colors),
                     size: 2
                 };
             }
             return plotData;
         }
 
+        static getColorStrings (encodedColors) {
+            const [red, green, blue] = BinaryArrays.decodeColumns(encodedColors);
+            const colors = new Array(red.length);
+            for (let i = 0; i < colors.length; i++) {
+                colors[i] = `rgb(${red[i]},${green[i]},${blue[i]})`;
+            }
+            return colors;
+        }
+
         onWidgetContainerResize (/*width, height*/) {
             if (this.currentPlotData) {
                 const {data, layout} = this.currentPlotData;
@@ -157,10 +175,16 @@ define([
                     layout.yaxis = {title: layout.yaxis};
                 }
                 const data = [];
+                const samples = [];
                 for (let i = 0; i < figureData.data.length; i++) {
-                    data.push(await this.getPlotData(figureData.data[i]));
+                    const line = figureData.data[i];
+                    const budget = +line.maxPoints || POINT_BUDGET;
+                    const sample = await this.getSample(line, budget);
+                    const stop = Math.min(sample.size, INITIAL_SAMPLE_SIZE);
+                    data.push(await this.getPlotData(line, {id: sample.id, start: 0, stop}));
+                    samples.push(sample);
                 }
-                return {data, layout};
+                return {data, layout, lines: figureData.data, samples};
             } catch (err) {
                 const {stderr, code} = err;
                 const msg = `Command:<br/><pre><code>${code}</code></pre><br/>` +
@@ -172,9 +196,45 @@ define([
         }
 
         async updatePlot (figureData) {
-            this.currentPlotData = await this.getPlotlyJSON(figureData);
-            const {data, layout} = this.currentPlotData;
-            Plotly.newPlot(this.$plot[0], data, layout);
+            const version = ++this.plotVersion;
+            const plotData = await this.getPlotlyJSON(figureData);
+            if (version === this.plotVersion) {
+                this.currentPlotData = plotData;
+                const {data, layout} = this.currentPlotData;
+                Plotly.newPlot(this.$plot[0], data, layout);
+                await this.refinePlot(version);
+            }
+        }
+
+        async refinePlot (version) {
+            // Add the remaining sampled points in chunks (after the coarse initial sample)
+            const {data, layout, lines, samples} = this.currentPlotData;
+            try {
+                for (let i = 0; i < samples.length; i++) {
+                    const {id, size} = samples[i];
+                    for (let start = INITIAL_SAMPLE_SIZE; start < size; start += SAMPLE_CHUNK_SIZE) {
+                        const stop = Math.min(size, start + SAMPLE_CHUNK_SIZE);
+                        const chunk = await this.getPlotData(lines[i], {id, start, stop});
+                        if (version !== this.plotVersion) {
+                            return;
+                        }
+                        TensorPlotterWidget.extendTrace(data[i], chunk);
+                        layout.datarevision = (layout.datarevision || 0) + 1;
+                        Plotly.react(this.$plot[0], data, layout);
+                    }
+                }
+            } catch (err) {
+                this._logger.warn(`Unable to refine plot: ${err.message}`);
+            }
+        }
+
+        static extendTrace (trace, chunk) {
+            ['x', 'y', 'z'].filter(key => chunk[key]).forEach(key => {
+                trace[key] = concat(trace[key], chunk[key]);
+            });
+            if (Array.isArray(chunk.marker.color)) {
+                trace.marker.color = trace.marker.color.concat(chunk.marker.color);
+            }
         }
 
         // Adding/Removing/Updating items
@@ -217,5 +277,12 @@ define([
 
     }
 
+    function concat(values, moreValues) {
+        const result = new values.constructor(values.length + moreValues.length);
+        result.set(values);
+        result.set(moreValues, values.length);
+        return result;
+    }
+
     return TensorPlotterWidget;
 });
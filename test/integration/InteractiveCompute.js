@@ -37,6 +37,18 @@ describe('InteractiveCompute', function() {
         });
     });
 
+    it('should write stdin sent immediately after spawning', function(done) {
+        const task = session.spawn('head -n 1');
+        let stdout = '';
+        task.on(Message.STDOUT, data => stdout += data.toString());
+        task.on(Message.COMPLETE, exitCode => {
+            assert.equal(exitCode, 0);
+            assert.equal(stdout, 'hello\n');
+            done();
+        });
+        task.write('hello\n');
+    });
+
     it('should be able to add files', async function() {
         await session.addFile('test.txt', 'hello world');
         const {stdout} = await session.exec('cat test.txt');
@@ -0,0 +1,39 @@
+describe('frame collector', function() {
+    const testFixture = require('../../../globals');
+    const FrameCollector = testFixture.requirejs('deepforge/compute/frame-collector');
+    const assert = require('assert');
+    let collector;
+    beforeEach(() => collector = new FrameCollector());
+
+    it('should reassemble frames split across chunks', function() {
+        const frame = FrameCollector.encode('PLOT 1 {"data": []}');
+        const payloads = [];
+        collector.on(payload => payloads.push(payload));
+        collector.receive(frame.slice(0, 3));
+        collector.receive(frame.slice(3, 10));
+        assert.equal(payloads.length, 0);
+        collector.receive(frame.slice(10));
+        assert.deepEqual(payloads, ['PLOT 1 {"data": []}']);
+        assert(!collector.hasPartialFrame());
+    });
+
+    it('should pass each frame in a chunk to callback', function() {
+        const data = Buffer.concat([
+            FrameCollector.encode('PLOT 1 {}'),
+            FrameCollector.encode('PLOT_PATCH 1 []'),
+        ]);
+        const payloads = [];
+        collector.on(payload => payloads.push(payload));
+        collector.receive(data);
+        assert.deepEqual(payloads, ['PLOT 1 {}', 'PLOT_PATCH 1 []']);
+    });
+
+    it('should decompress gzipped frames', function() {
+        const {GZIP} = FrameCollector.FLAGS;
+        const frame = FrameCollector.encode('PLOT 2 {"layout": {}}', GZIP);
+        const payloads = [];
+        collector.on(payload => payloads.push(payload));
+        collector.receive(frame);
+        assert.deepEqual(payloads, ['PLOT 2 {"layout": {}}']);
+    });
+});
@@ -0,0 +1,81 @@
+describe('interactive kernel', function() {
+    const testFixture = require('../../../../globals');
+    const Kernel = testFixture.requirejs('deepforge/compute/interactive/kernel');
+    const Message = testFixture.requirejs('deepforge/compute/interactive/message');
+    const EventEmitter = testFixture.requirejs('deepforge/EventEmitter');
+    const assert = require('assert');
+    let session, kernel;
+
+    class MockTask extends EventEmitter {
+        constructor() {
+            super();
+            this.requests = [];
+        }
+
+        write(data) {
+            this.requests.push(...JSON.parse(data));
+        }
+
+        respond(responses) {
+            this.emit(Message.STDOUT, JSON.stringify(responses) + '\n');
+        }
+    }
+
+    beforeEach(() => {
+        session = {
+            tasks: [],
+            spawn() {
+                const task = new MockTask();
+                this.tasks.push(task);
+                return task;
+            },
+        };
+        kernel = new Kernel(session, 'python kernel.py');
+    });
+
+    it('should start the kernel on the first request', function() {
+        assert(!kernel.isRunning());
+        kernel.call('points', {});
+        assert(kernel.isRunning());
+        kernel.call('points', {});
+        assert.equal(session.tasks.length, 1);
+    });
+
+    it('should send batched requests in a single write', async function() {
+        const results = kernel.batch([
+            {method: 'points', params: {}},
+            {method: 'colors', params: {}},
+        ]);
+        const [task] = session.tasks;
+        const [points, colors] = task.requests;
+        task.respond([
+            {id: colors.id, result: 'colors'},
+            {id: points.id, result: 'points'},
+        ]);
+        assert.deepEqual(await results, ['points', 'colors']);
+    });
+
+    it('should reject requests with errors', async function() {
+        const result = kernel.call('points', {});
+        const [task] = session.tasks;
+        const [request] = task.requests;
+        task.respond([{id: request.id, error: {message: 'bad', traceback: 'tb'}}]);
+        await assert.rejects(result, err => err.stderr === 'tb');
+    });
+
+    it('should reject pending requests on exit', async function() {
+        const result = kernel.call('points', {});
+        const [task] = session.tasks;
+        task.emit(Message.STDERR, 'Segmentation fault');
+        task.emit(Message.COMPLETE, 139);
+        await assert.rejects(result, /exited with code 139/);
+        assert(!kernel.isRunning());
+    });
+
+    it('should reject requests without a response after the timeout', async function() {
+        kernel = new Kernel(session, 'python kernel.py', 10);
+        const result = kernel.call('points', {});
+        await assert.rejects(result, /No response after/);
+        assert.deepEqual(kernel.pending, {});
+    });
+});
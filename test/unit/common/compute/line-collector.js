@@ -39,4 +39,12 @@ describe('line collector', function() {
         data.forEach(data => collector.receive(data));
         assert.equal(lines, data.join('').replace(/\n/g, ''));
     });
+
+    it('should pass each line from a single chunk to callback', async function() {
+        const lines = [];
+        collector.on(line => lines.push(line));
+        collector.receive('abc\ndef\ngh');
+        collector.receive('i\n');
+        assert.deepEqual(lines, ['abc', 'def', 'ghi']);
+    });
 });
@@ -0,0 +1,53 @@
+describe('BinaryArrays', function() {
+    const testFixture = require('../../../globals');
+    const BinaryArrays = testFixture.requirejs('deepforge/viz/BinaryArrays');
+    const assert = require('assert');
+    const encode = (TypedArray, values) =>
+        Buffer.from(new TypedArray(values).buffer).toString('base64');
+
+    it('should decode 1D arrays', function() {
+        const encoded = {dtype: 'f8', bdata: encode(Float64Array, [0.5, 1, 2])};
+        assert.deepEqual(BinaryArrays.decode(encoded), [0.5, 1, 2]);
+    });
+
+    it('should reshape using string shapes', function() {
+        const bdata = encode(Int32Array, [1, 2, 3, 4, 5, 6]);
+        const encoded = {dtype: 'i4', shape: '3, 2', bdata};
+        assert.deepEqual(BinaryArrays.decode(encoded), [[1, 2], [3, 4], [5, 6]]);
+    });
+
+    it('should replace masked entries with null', function() {
+        const bdata = encode(Float32Array, [1, 2, 3, 4]);
+        const mask = Buffer.from([0b0100]).toString('base64');
+        const encoded = {dtype: 'f4', shape: [2, 2], bdata, mask};
+        assert.deepEqual(BinaryArrays.decode(encoded), [[1, 2], [null, 4]]);
+    });
+
+    it('should return typed arrays if requested', function() {
+        const encoded = {dtype: 'f4', bdata: encode(Float32Array, [1, 2])};
+        const values = BinaryArrays.decode(encoded, true);
+        assert(values instanceof Float32Array);
+    });
+
+    it('should decode the columns of 2D arrays', function() {
+        const bdata = encode(Float32Array, [1, 2, 3, 4, 5, 6]);
+        const encoded = {dtype: 'f4', shape: [3, 2], bdata};
+        const [x, y] = BinaryArrays.decodeColumns(encoded);
+        assert(x instanceof Float32Array);
+        assert.deepEqual(Array.from(x), [1, 3, 5]);
+        assert.deepEqual(Array.from(y), [2, 4, 6]);
+    });
+
+    it('should decode 1D arrays as a single column', function() {
+        const encoded = {dtype: 'f4', shape: [2], bdata: encode(Float32Array, [1, 2])};
+        const [y, ...rest] = BinaryArrays.decodeColumns(encoded);
+        assert.deepEqual(Array.from(y), [1, 2]);
+        assert.equal(rest.length, 0);
+    });
+
+    it('should decode nested values', function() {
+        const x = {dtype: 'i4', bdata: encode(Int32Array, [1, 2])};
+        const state = {axes: [{title: 'a', x}]};
+        assert.deepEqual(BinaryArrays.decodeAll(state), {axes: [{title: 'a', x: [1, 2]}]});
+    });
+});
@@ -0,0 +1,44 @@
+describe('PlotPatch', function() {
+    const testFixture = require('../../../globals');
+    const PlotPatch = testFixture.requirejs('deepforge/viz/PlotPatch');
+    const assert = require('assert');
+
+    it('should set nested values', function() {
+        const state = {axes: [{title: 'old'}]};
+        PlotPatch.apply(state, [['set', ['axes', 0, 'title'], 'new']]);
+        assert.equal(state.axes[0].title, 'new');
+    });
+
+    it('should append points to existing lines', function() {
+        const state = {lines: [{points: [[0, 1]]}]};
+        PlotPatch.apply(state, [['append', ['lines', 0, 'points'], [[1, 2], [2, 3]]]]);
+        assert.deepEqual(state.lines[0].points, [[0, 1], [1, 2], [2, 3]]);
+    });
+
+    it('should add new artists', function() {
+        const state = {lines: [{label: 'a'}]};
+        PlotPatch.apply(state, [['append', ['lines'], [{label: 'b'}]]]);
+        assert.deepEqual(state.lines.map(line => line.label), ['a', 'b']);
+    });
+
+    it('should remove artists', function() {
+        const state = {axes: [{}, {}, {}]};
+        PlotPatch.apply(state, [['truncate', ['axes'], 1]]);
+        assert.equal(state.axes.length, 1);
+    });
+
+    it('should delete keys', function() {
+        const state = {title: 'abc', id: 1};
+        PlotPatch.apply(state, [['delete', ['title'], null]]);
+        assert.deepEqual(state, {id: 1});
+    });
+
+    it('should replace the entire state', function() {
+        const state = PlotPatch.apply({id: 1}, [['set', [], {id: 2}]]);
+        assert.deepEqual(state, {id: 2});
+    });
+
+    it('should throw error on unknown operation', function() {
+        assert.throws(() => PlotPatch.apply({}, [['move', ['a'], 1]]));
+    });
+});
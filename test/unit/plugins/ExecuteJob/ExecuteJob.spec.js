@@ -223,6 +223,103 @@ describe('ExecuteJob', function () {
             const children = await plugin.core.loadChildren(graph);
             expect(children.length).to.equal(0);
         });
+
+        it('should keep saved metadata when resuming', async function() {
+            const graph = plugin.core.createNode({
+                base: plugin.META.Graph,
+                parent: plugin.activeNode
+            });
+            plugin.core.createNode({base: plugin.META.Line, parent: graph});
+            plugin.core.setAttribute(plugin.activeNode, 'lastAppliedCmd', 3);
+
+            await plugin.save();
+            await plugin.prepare(true);
+            const jobId = plugin.core.getPath(plugin.activeNode);
+            const children = await plugin.core.loadChildren(graph);
+            expect(children.length).to.equal(1);
+            expect(plugin.lastAppliedCmd[jobId]).to.equal(3);
+        });
+    });
+
+    describe('metadata commands', function() {
+        beforeEach(preparePlugin);
+
+        it('should not reapply streamed commands when parsing all stdout', async function() {
+            const jobId = plugin.core.getPath(node);
+            const applied = [];
+            plugin.onMetadataCommand = async (job, cmd, id) => applied.push(id);
+            plugin.lastAppliedCmd[jobId] = 1;
+            const lines = [
+                'deepforge-cmd PLOT 1 {}',
+                'some output',
+                'deepforge-cmd PLOT_PATCH 2 []',
+            ];
+
+            await plugin.parseForMetadataCmds(node, lines, true);
+            expect(applied).to.deep.equal([2]);
+            expect(plugin.lastAppliedCmd[jobId]).to.equal(2);
+        });
+
+        it('should load command content stored in the blob', async function() {
+            const contents = [];
+            plugin.onMetadataCommand = async (job, cmd, id, content) => contents.push(content);
+            plugin.blobClient.getObjectAsString = async hash => JSON.stringify({hash});
+
+            await plugin.parseForMetadataCmds(node, ['deepforge-cmd PLOT 1 @abc123'], false);
+            expect(contents).to.deep.equal([{hash: 'abc123'}]);
+        });
+
+        it('should save the applied command count with the states', async function() {
+            const jobId = plugin.core.getPath(node);
+            plugin.lastAppliedCmd[jobId] = 0;
+            plugin.metadataStore.put = async () => ({});
+            const lines = [
+                'deepforge-cmd PLOT 1 {"data": [], "layout": {}}',
+                'deepforge-cmd PLOT_PATCH 1 [["set", ["layout", "title"], "loss"]]',
+            ];
+
+            await plugin.parseForMetadataCmds(node, lines, false);
+            expect(plugin.core.getAttribute(node, 'lastAppliedCmd')).to.equal(undefined);
+            await plugin.applyMetadataUpdates();
+            expect(plugin.core.getAttribute(node, 'lastAppliedCmd')).to.equal(2);
+        });
+
+        it('should not save patches applied during a flush', async function() {
+            const jobId = plugin.core.getPath(node);
+            const lines = [
+                'deepforge-cmd PLOT 1 {"data": [{"x": [1]}], "layout": {}}',
+                'deepforge-cmd PLOT 2 {"data": [{"x": [1]}], "layout": {}}',
+                'deepforge-cmd PLOT_PATCH 2 [["append", ["data", 0, "x"], [2]]]',
+            ];
+            let uploaded;
+            const uploading = new Promise(resolve => uploaded = resolve);
+            plugin.metadataStore.put = async () => {
+                await uploading;
+                throw new Error('unavailable');
+            };
+            plugin.lastAppliedCmd[jobId] = 0;
+            await plugin.parseForMetadataCmds(node, lines.slice(0, 2), false);
+
+            const flushing = plugin.applyMetadataUpdates();
+            await plugin.parseForMetadataCmds(node, lines.slice(2), false);
+            uploaded();
+            await flushing;
+            expect(plugin.core.getAttribute(node, 'lastAppliedCmd')).to.equal(2);
+
+            // Resume from the saved states
+            plugin.initializeMetadataUpdates(1000);
+            plugin.metadataStore.put = async () => {
+                throw new Error('unavailable');
+            };
+            await plugin.initializeMetadata(node, true);
+            await plugin.parseForMetadataCmds(node, lines, true);
+            await plugin.applyMetadataUpdates();
+
+            const metadata = await plugin.getMetadataNodes(node);
+            const figure = metadata.find(node => plugin.core.getAttribute(node, 'id') === 2);
+            const {data} = JSON.parse(plugin.core.getAttribute(figure, 'data'));
+            expect(data[0].x).to.deep.equal([1, 2]);
+        });
     });
 
     describe('resume errors', function() {
@@ -0,0 +1,56 @@
+describe('FlushScheduler', function() {
+    const testFixture = require('../../../../globals');
+    const FlushScheduler = testFixture.requirejs('plugin/ExecuteJob/ExecuteJob/metadata/FlushScheduler');
+    const assert = require('assert');
+
+    it('should flush the latest value for each key', async function() {
+        const flushed = [];
+        const scheduler = new FlushScheduler(updates => flushed.push(updates), 1000);
+        scheduler.set('a', 1);
+        scheduler.set('a', 2);
+        scheduler.set('b', 3);
+        await scheduler.flush();
+        assert.deepEqual(flushed, [{a: 2, b: 3}]);
+    });
+
+    it('should count coalesced updates', function() {
+        const scheduler = new FlushScheduler(() => {}, 1000);
+        scheduler.set('a', 1);
+        scheduler.set('a', 2);
+        scheduler.set('a', 3);
+        scheduler.cancel();
+        assert.equal(scheduler.updateCount, 3);
+        assert.equal(scheduler.coalescedCount, 2);
+    });
+
+    it('should flush once per interval', async function() {
+        let flushCount = 0;
+        const scheduler = new FlushScheduler(() => flushCount++, 20);
+        scheduler.set('a', 1);
+        scheduler.set('a', 2);
+        await new Promise(resolve => setTimeout(resolve, 50));
+        assert.equal(flushCount, 1);
+    });
+
+    it('should not flush values removed with take', async function() {
+        let flushCount = 0;
+        const scheduler = new FlushScheduler(() => flushCount++, 10);
+        scheduler.set('a', 1);
+        assert.deepEqual(scheduler.take(), {a: 1});
+        await new Promise(resolve => setTimeout(resolve, 30));
+        assert.equal(flushCount, 0);
+    });
+
+    it('should flush snapshots of the values', async function() {
+        const flushed = [];
+        const snapshot = value => value.slice();
+        const scheduler = new FlushScheduler(updates => flushed.push(updates), 1000, snapshot);
+        const value = [1];
+        scheduler.set('a', value);
+        const flushing = scheduler.flush();
+        value.push(2);
+        await flushing;
+        assert.deepEqual(flushed, [{a: [1]}]);
+        assert.deepEqual(scheduler.get('a'), [1, 2]);
+    });
+});
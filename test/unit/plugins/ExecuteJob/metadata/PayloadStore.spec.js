@@ -0,0 +1,37 @@
+describe('PayloadStore', function() {
+    const testFixture = require('../../../../globals');
+    const PayloadStore = testFixture.requirejs('plugin/ExecuteJob/ExecuteJob/metadata/PayloadStore');
+    const assert = require('assert');
+    let files, store;
+
+    beforeEach(() => {
+        files = {};
+        const client = {
+            putFile: async (filename, content) => {
+                files[filename] = content;
+                return {backend: 'test', data: filename};
+            },
+            getFile: async dataInfo => Buffer.from(files[dataInfo.data]),
+        };
+        store = new PayloadStore(async () => client, 'project/metadata');
+    });
+
+    it('should store values by content hash', async function() {
+        const reference = await store.put({data: [1, 2, 3]});
+        assert(PayloadStore.isReference(reference));
+        assert.deepEqual(Object.keys(files), [`project/metadata/${reference.hash}.json`]);
+    });
+
+    it('should only upload identical values once', async function() {
+        const ref1 = await store.put({data: [1, 2, 3]});
+        const ref2 = await store.put({data: [1, 2, 3]});
+        assert.equal(ref1.hash, ref2.hash);
+        assert.equal(Object.keys(files).length, 1);
+    });
+
+    it('should retrieve stored values', async function() {
+        const value = {data: [{x: [1, 2]}], layout: {title: 'test'}};
+        const reference = await store.put(value);
+        assert.deepEqual(await store.get(reference), value);
+    });
+});
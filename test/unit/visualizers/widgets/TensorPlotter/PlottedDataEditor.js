@@ -56,4 +56,27 @@ describe('PlottedDataEditor', function() {
             );
         });
     });
+
+    describe('getStatisticsSummary', function() {
+        const stats = {
+            count: 10, nan_count: 0, inf_count: 0,
+            min: 0, max: 1 / 3, mean: 0.25, std: 0.125,
+        };
+
+        it('should summarize range and mean', function() {
+            const summary = PlottedDataEditor.getStatisticsSummary(stats);
+            assert.equal(summary, 'range: [0, 0.3333], mean: 0.25 \u00b1 0.125');
+        });
+
+        it('should include invalid value count', function() {
+            const summary = PlottedDataEditor.getStatisticsSummary(
+                Object.assign({}, stats, {nan_count: 2, inf_count: 1})
+            );
+            assert(summary.endsWith('3 NaN/inf'));
+        });
+
+        it('should be empty without values', function() {
+            assert.equal(PlottedDataEditor.getStatisticsSummary(null), '');
+        });
+    });
 });
@@ -0,0 +1,84 @@
+"""
+Measure the latency of drawing figures with the plotly matplotlib backend.
+
+Figures with 1, 10 and 100 lines are drawn repeatedly (updating a single line
+before each draw) and the mean time per draw is reported. Figure updates are
+sent synchronously and discarded.
+
+Usage:
+    python utils/benchmark-plotly-backend.py [--templates DIR] [--repeat N]
+
+The templates directory defaults to the GenerateJob templates of this
+repository. Pass the templates of another checkout to compare the results.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'plugins', 'GenerateJob', 'templates'
+)
+ARTIST_COUNTS = (1, 10, 100)
+POINT_COUNT = 1000
+
+
+def setup_job_dir(templates_dir):
+    job_dir = tempfile.mkdtemp()
+    shutil.copy(os.path.join(templates_dir, 'plotly_backend.py'), job_dir)
+    plotting_path = os.path.join(templates_dir, 'deepforge_plotting.py')
+    os.makedirs(os.path.join(job_dir, 'deepforge'))
+    open(os.path.join(job_dir, 'deepforge', '__init__.py'), 'w').close()
+    if os.path.exists(plotting_path):
+        shutil.copy(plotting_path, os.path.join(job_dir, 'deepforge', 'plotting.py'))
+    return job_dir
+
+
+def benchmark(plt, artist_count, repeat):
+    fig, ax = plt.subplots()
+    lines = [ax.plot(np.random.rand(POINT_COUNT))[0] for _ in range(artist_count)]
+    # older versions of the backend close the figure (replacing its canvas)
+    canvas = fig.canvas
+    canvas.draw()
+
+    elapsed = 0
+    for i in range(repeat):
+        lines[i % artist_count].set_ydata(np.random.rand(POINT_COUNT))
+        start = time.perf_counter()
+        canvas.draw()
+        elapsed += time.perf_counter() - start
+    plt.close(fig)
+    return elapsed / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--templates', default=TEMPLATES_DIR)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ['DEEPFORGE_PLOT_INTERVAL'] = '0'
+    os.environ['MPLBACKEND'] = 'module://plotly_backend'
+    sys.path.insert(0, setup_job_dir(args.templates))
+    import matplotlib.pyplot as plt
+
+    results = []
+    stdout = sys.stdout
+    with open(os.devnull, 'w') as devnull:
+        sys.stdout = devnull
+        try:
+            for count in ARTIST_COUNTS:
+                results.append((count, benchmark(plt, count, args.repeat)))
+        finally:
+            sys.stdout = stdout
+
+    for (count, latency) in results:
+        print(f'{count:>4} artists: {latency * 1000:8.1f} ms/draw')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+"""
+Measure the throughput of the deepforge serializers against plain pickle.
+
+NumPy arrays, pandas data frames and Keras models (if pandas or tensorflow are
+installed) are dumped to and loaded from a temporary file repeatedly and the
+mean throughput (in MB of in-memory data per second) is reported.
+
+Usage:
+    python utils/benchmark-serialization.py [--templates DIR] [--repeat N]
+
+The templates directory defaults to the GenerateJob templates of this
+repository. Pass the templates of another checkout to compare the results.
+Compression is disabled unless DEEPFORGE_COMPRESSION is set explicitly.
+"""
+import argparse
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+TEMPLATES_DIR = os.path.join(
+    os.path.dirname(__file__), '..', 'src', 'plugins', 'GenerateJob', 'templates'
+)
+ROW_COUNT = 1000000
+
+
+def setup_job_dir(templates_dir):
+    job_dir = tempfile.mkdtemp()
+    os.makedirs(os.path.join(job_dir, 'deepforge'))
+    open(os.path.join(job_dir, 'deepforge', '__init__.py'), 'w').close()
+    shutil.copy(
+        os.path.join(templates_dir, 'deepforge.ejs'),
+        os.path.join(job_dir, 'deepforge', 'serialization.py')
+    )
+    return job_dir
+
+
+def get_ndarray():
+    return np.random.rand(ROW_COUNT, 32).astype(np.float32), None
+
+
+def get_dataframe():
+    import pandas as pd
+    data = pd.DataFrame(np.random.rand(ROW_COUNT, 8), columns=list('abcdefgh'))
+    data['label'] = np.random.choice(['cat', 'dog', 'bird'], ROW_COUNT)
+    return data, int(data.memory_usage(deep=True).sum())
+
+
+def get_keras_model():
+    from tensorflow import keras
+    model = keras.Sequential([
+        keras.Input(shape=(1024,)),
+        keras.layers.Dense(2048),
+        keras.layers.Dense(2048),
+        keras.layers.Dense(10),
+    ])
+    return model, sum(weights.nbytes for weights in model.get_weights())
+
+
+def pickle_dump(data, outfile):
+    pickle.dump(data, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def benchmark(dump, load, data, repeat):
+    (handle, path) = tempfile.mkstemp()
+    os.close(handle)
+    dump_time = load_time = 0
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with open(path, 'wb') as outfile:
+                dump(data, outfile)
+            dump_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            with open(path, 'rb') as infile:
+                load(infile)
+            load_time += time.perf_counter() - start
+    finally:
+        os.remove(path)
+    return dump_time / repeat, load_time / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--templates', default=TEMPLATES_DIR)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DEEPFORGE_COMPRESSION', 'none')
+    sys.path.insert(0, setup_job_dir(args.templates))
+    from deepforge import serialization
+
+    def deepforge_load(data):
+        full_name = serialization.get_full_class_name(data)
+        return lambda infile: serialization.load(full_name, infile)
+
+    for get_data in (get_ndarray, get_dataframe, get_keras_model):
+        try:
+            (data, size) = get_data()
+        except ImportError as err:
+            print(f'Skipping {get_data.__name__[4:]}: {err}')
+            continue
+
+        size = size or data.nbytes
+        name = type(data).__name__
+        for (method, dump, load) in (
+            ('pickle', pickle_dump, pickle.load),
+            ('deepforge', serialization.dump, deepforge_load(data)),
+        ):
+            try:
+                (dump_time, load_time) = benchmark(dump, load, data, args.repeat)
+            except Exception as err:
+                print(f'{name:>12} {method:>10}: failed ({err})')
+                continue
+            dump_rate = size / dump_time / 1e6
+            load_rate = size / load_time / 1e6
+            print(f'{name:>12} {method:>10}: dump {dump_rate:8.1f} MB/s, load {load_rate:8.1f} MB/s')
+
+
+if __name__ == '__main__':
+    main()